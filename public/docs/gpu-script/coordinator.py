@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Host-level coordinator for several script.py workers: workers register over a
+local HTTP socket, their pool traffic is relayed under a host-wide rate
+budget, and their status is aggregated into a single Telegram message and a
+/metrics endpoint. Settings loading, logging and the small file/HTML helpers
+come from script.py.
+"""
+import requests
+import os
+import time
+import json
+import hashlib
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import script
+from script import _atomic_write_json, _escape_html, _load_settings, _stop_logging, logger
+
+# The workers own the rotating log file; the coordinator logs to the console only.
+script.LOG_FILE = ""
+
+_SETTINGS = _load_settings()
+
+TELEGRAM_STATE_FILE = "coordinator_telegram_state.json"
+
+TELEGRAM_BOT_TOKEN = str(_SETTINGS.get("telegram_accesstoken", ""))
+TELEGRAM_CHAT_ID = str(_SETTINGS.get("telegram_chatid", ""))
+API_URL = _SETTINGS.get("api_url", "")
+BIND_HOST = str(_SETTINGS.get("coordinator_host", "127.0.0.1"))
+BIND_PORT = int(_SETTINGS.get("coordinator_port", 8765) or 8765)
+FETCH_PER_MINUTE = float(_SETTINGS.get("coordinator_fetch_per_minute", 30) or 30)
+SUBMIT_PER_MINUTE = float(_SETTINGS.get("coordinator_submit_per_minute", 60) or 60)
+STATUS_INTERVAL_SECONDS = int(_SETTINGS.get("coordinator_status_interval_seconds", 30) or 30)
+MAX_BUDGET_WAIT_SECONDS = 10
+WORKER_STALE_SECONDS = 600
+
+_HTTP_LOCAL = threading.local()
+
+WORKERS = {}
+WORKERS_LOCK = threading.Lock()
+COUNTERS = {"proxied": 0, "throttled": 0, "upstream_errors": 0}
+STATUS_MESSAGE_ID = None
+
+def _http():
+    """
+    requests session for the calling thread. Sessions are not thread-safe, so
+    each request handler thread and the status loop get their own.
+    """
+    session = getattr(_HTTP_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        _HTTP_LOCAL.session = session
+    return session
+
+# ==============================================================================================
+#                                    HOST-WIDE RATE BUDGET
+# ==============================================================================================
+
+class TokenBucket:
+    """Refill `per_minute` tokens per minute, holding at most `per_minute`."""
+
+    def __init__(self, per_minute):
+        self.capacity = max(1.0, float(per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait):
+        """Take a token, waiting up to `max_wait` seconds. Returns seconds until the next token on failure."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return 0
+                wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return max(1, int(wait + 0.999))
+            time.sleep(min(wait, 1.0))
+
+BUDGETS = {
+    "fetch": TokenBucket(FETCH_PER_MINUTE),
+    "submit": TokenBucket(SUBMIT_PER_MINUTE),
+}
+
+def _budget_category(method, url):
+    path = urlsplit(url).path.rstrip("/")
+    if method.upper() == "POST" and path.endswith("/submit"):
+        return "submit"
+    if method.upper() == "GET":
+        return "fetch"
+    return None
+
+def _allowed_target(url):
+    if not API_URL:
+        return False
+    want = urlsplit(API_URL)
+    got = urlsplit(url)
+    return (got.scheme, got.netloc) == (want.scheme, want.netloc)
+
+# ==============================================================================================
+#                                    WORKER REGISTRY & PROXY
+# ==============================================================================================
+
+def _touch_worker(worker_id, fields=None):
+    with WORKERS_LOCK:
+        entry = WORKERS.setdefault(worker_id, {"registered_at": time.time(), "status": {}, "requests": 0})
+        entry["last_seen"] = time.time()
+        if fields:
+            entry.update(fields)
+        return entry
+
+def _count(name):
+    with WORKERS_LOCK:
+        COUNTERS[name] = COUNTERS.get(name, 0) + 1
+
+def handle_proxy(payload):
+    worker_id = str(payload.get("worker") or "unknown")
+    method = str(payload.get("method") or "GET").upper()
+    url = str(payload.get("url") or "")
+    if not _allowed_target(url):
+        return 403, {"error": "Target URL is not the configured pool"}
+    entry = _touch_worker(worker_id)
+    category = _budget_category(method, url)
+    if category:
+        retry_after = BUDGETS[category].acquire(MAX_BUDGET_WAIT_SECONDS)
+        if retry_after:
+            _count("throttled")
+            return 200, {
+                "status_code": 429,
+                "headers": {"Retry-After": str(retry_after)},
+                "text": json.dumps({"error": f"Host {category} budget exhausted"}),
+            }
+    try:
+        r = _http().request(
+            method,
+            url,
+            headers=payload.get("headers") or None,
+            params=payload.get("params") or None,
+            json=payload.get("json"),
+            timeout=float(payload.get("timeout") or 15),
+        )
+    except requests.RequestException as e:
+        _count("upstream_errors")
+        return 200, {"transport_error": type(e).__name__, "detail": str(e)[:200]}
+    _count("proxied")
+    with WORKERS_LOCK:
+        entry["requests"] = int(entry.get("requests", 0)) + 1
+    headers = {}
+    if r.headers.get("Retry-After") is not None:
+        headers["Retry-After"] = r.headers.get("Retry-After")
+    return 200, {"status_code": r.status_code, "headers": headers, "text": r.text}
+
+# ==============================================================================================
+#                                    AGGREGATED STATUS
+# ==============================================================================================
+
+def _live_workers():
+    now = time.time()
+    with WORKERS_LOCK:
+        return {k: dict(v) for k, v in WORKERS.items() if now - v.get("last_seen", 0) < WORKER_STALE_SECONDS}
+
+def format_fleet_html():
+    workers = _live_workers()
+    total_blocks = sum(int((w.get("status") or {}).get("session_blocks", 0) or 0) for w in workers.values())
+    total_pending = sum(int((w.get("status") or {}).get("pending_keys", 0) or 0) for w in workers.values())
+    lines = [
+        "🖥️ <b>Host Status</b>",
+        f"👷 <b>Workers</b>: <code>{len(workers)}</code>",
+        f"✅ <b>Blocks</b>: <code>{total_blocks}</code>",
+        f"📦 <b>Pending Keys</b>: <code>{total_pending}</code>",
+        f"🚦 <b>Throttled</b>: <code>{COUNTERS['throttled']}</code>",
+        "",
+    ]
+    for wid in sorted(workers):
+        st = workers[wid].get("status") or {}
+        lines.append(
+            f"• <code>{_escape_html(wid)}</code> GPU <code>{_escape_html(st.get('gpu', ''))}</code> "
+            f"blocks <code>{st.get('session_blocks', 0)}</code> "
+            f"pending <code>{st.get('pending_keys', 0)}</code>"
+        )
+        if st.get("keyfound") not in (None, "", "-"):
+            lines.append(f"  🔑 <code>{_escape_html(st.get('keyfound'))}</code>")
+        if st.get("last_error") not in (None, "", "-"):
+            lines.append(f"  ❗ <i>{_escape_html(st.get('last_error'))}</i>")
+    lines.append(f"🕒 <i>Updated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>")
+    return "\n".join(lines)
+
+def format_metrics():
+    workers = _live_workers()
+    out = [
+        f"united_coordinator_workers {len(workers)}",
+        f"united_coordinator_proxied_total {COUNTERS['proxied']}",
+        f"united_coordinator_throttled_total {COUNTERS['throttled']}",
+        f"united_coordinator_upstream_errors_total {COUNTERS['upstream_errors']}",
+    ]
+    for wid, w in sorted(workers.items()):
+        st = w.get("status") or {}
+        label = wid.replace("\\", "\\\\").replace('"', '\\"')
+        out.append(f'united_worker_blocks{{worker="{label}"}} {int(st.get("session_blocks", 0) or 0)}')
+        out.append(f'united_worker_pending_keys{{worker="{label}"}} {int(st.get("pending_keys", 0) or 0)}')
+        out.append(f'united_worker_requests_total{{worker="{label}"}} {int(w.get("requests", 0) or 0)}')
+    return "\n".join(out) + "\n"
+
+def _load_telegram_state():
+    try:
+        if os.path.exists(TELEGRAM_STATE_FILE):
+            with open(TELEGRAM_STATE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+    except Exception:
+        pass
+    return {}
+
+def _save_telegram_state(state):
+    try:
+        _atomic_write_json(TELEGRAM_STATE_FILE, state)
+    except Exception:
+        pass
+
+def publish_fleet_status():
+    global STATUS_MESSAGE_ID
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        return
+    text = format_fleet_html()
+    st = _load_telegram_state()
+    if STATUS_MESSAGE_ID is None and isinstance(st.get("message_id"), int):
+        STATUS_MESSAGE_ID = st["message_id"]
+    # Ignore the timestamp line when deciding whether anything changed.
+    new_hash = hashlib.sha256(text.rsplit("\n", 1)[0].encode("utf-8")).hexdigest()
+    if STATUS_MESSAGE_ID is not None and st.get("last_hash") == new_hash:
+        return
+    base = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
+    payload = {"chat_id": TELEGRAM_CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
+    try:
+        if STATUS_MESSAGE_ID is not None:
+            r = _http().post(f"{base}/editMessageText", data=dict(payload, message_id=STATUS_MESSAGE_ID), timeout=10)
+            if r.status_code == 200 or "message is not modified" in (r.text or "").lower():
+                st["last_hash"] = new_hash
+                _save_telegram_state(st)
+                return
+            STATUS_MESSAGE_ID = None
+        r = _http().post(f"{base}/sendMessage", data=payload, timeout=10)
+        if r.status_code == 200:
+            mid = ((r.json() or {}).get("result") or {}).get("message_id")
+            if mid is not None:
+                STATUS_MESSAGE_ID = int(mid)
+                _save_telegram_state({"message_id": STATUS_MESSAGE_ID, "last_hash": new_hash})
+        else:
+            logger("Error", f"Error creating fleet status message: {r.status_code}")
+    except requests.RequestException as e:
+        logger("Error", f"Request error while publishing fleet status: {type(e).__name__}")
+
+def _status_loop():
+    while True:
+        time.sleep(STATUS_INTERVAL_SECONDS)
+        try:
+            publish_fleet_status()
+        except Exception as e:
+            logger("Error", f"Fleet status loop error: {e}")
+
+# ==============================================================================================
+#                                    LOCAL SOCKET
+# ==============================================================================================
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length > 0 else b"{}"
+        try:
+            data = json.loads(raw.decode("utf-8") or "{}")
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send(200, format_metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        elif self.path == "/status":
+            self._send(200, {"workers": _live_workers(), "counters": COUNTERS})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.path == "/register":
+            wid = str(payload.get("worker") or "unknown")
+            _touch_worker(wid, {"pid": payload.get("pid"), "gpu": payload.get("gpu")})
+            logger("Success", f"Worker registered: {wid}")
+            self._send(200, {"ok": True})
+        elif self.path == "/status":
+            wid = str(payload.get("worker") or "unknown")
+            st = payload.get("status")
+            _touch_worker(wid, {"status": st if isinstance(st, dict) else {}})
+            self._send(200, {"ok": True})
+        elif self.path == "/proxy":
+            code, body = handle_proxy(payload)
+            self._send(code, body)
+        else:
+            self._send(404, {"error": "Not found"})
+
+# ==============================================================================================
+#                                    MAIN
+# ==============================================================================================
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer((BIND_HOST, BIND_PORT), CoordinatorHandler)
+    threading.Thread(target=_status_loop, daemon=True).start()
+    logger("Info", f"Coordinator listening on http://{BIND_HOST}:{BIND_PORT} (fetch {FETCH_PER_MINUTE:g}/min, submit {SUBMIT_PER_MINUTE:g}/min)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger("Info", "Coordinator stopped.")
+    finally:
+        server.server_close()
+        _stop_logging()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for script.PoolWorker — run with:
+    python -m unittest pool_worker_test -v
+
+Drives the embeddable worker in-process with a fake pool client, a fake
+engine and a fake clock, so every cycle is deterministic and nothing sleeps
+or spawns a process. Needs the worker's own dependencies (`requests`,
+`colorama`).
+"""
+import json
+import os
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import script
+
+script.LOG_FILE = ""
+script.LOG_CONSOLE = False
+
+TARGET = "1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH"
+BLOCK_START = 0x400000000
+BLOCK_END = 0x4FFFFFFFF
+
+# ---------------------------------------------------------------------------
+# Fakes
+# ---------------------------------------------------------------------------
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+        self.text = json.dumps(payload) if payload is not None else ""
+
+    def json(self):
+        if self.payload is None:
+            raise ValueError("no JSON body")
+        return self.payload
+
+
+class FakePool:
+    """
+    Serves the same block on every lease and records leases and submits.
+    With `reject` set every submit gets the route's 400 for missing keys.
+    """
+
+    def __init__(self, addresses=10, reject=False):
+        self.addresses = [f"1Check{i:02d}" for i in range(addresses)]
+        self.reject = reject
+        self.leases = []
+        self.submits = []
+
+    def request(self, method, url, **kwargs):
+        if method == "GET":
+            self.leases.append(kwargs.get("params") or {})
+            return FakeResponse(200, {
+                "id": len(self.leases),
+                "range": {"start": hex(BLOCK_START), "end": hex(BLOCK_END)},
+                "checkwork_addresses": self.addresses,
+            })
+        self.submits.append(kwargs["json"])
+        if self.reject:
+            return FakeResponse(400, {"error": "Not all private keys are correct"})
+        return FakeResponse(200, {"ok": True})
+
+
+class FakeEngine:
+    """Writes `records` (address, key) as BitCrack lines to the -o file and exits with `code`."""
+
+    def __init__(self, records=(), code=0):
+        self.records = list(records)
+        self.code = code
+        self.commands = []
+
+    def run(self, command, cwd, on_line):
+        self.commands.append(command)
+        out_file = command[command.index("-o") + 1]
+        with open(out_file, "w", encoding="utf-8") as f:
+            f.write("".join(f"{addr} {key}\n" for (addr, key) in self.records))
+        on_line("[00:00:01] 1.50 MKey/s")
+        return self.code
+
+    def stop(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.on_sleep = None
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep()
+
+
+def _key(n):
+    return "%064x" % (BLOCK_START + n)
+
+# ---------------------------------------------------------------------------
+
+class PoolWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="pool-worker-")
+        self.settings = {
+            "api_url": "http://pool.test/api/block",
+            "user_token": "token",
+            "worker_name": "rig",
+            "vanitysearch_path": "/opt/VanitySearch",
+            "keyfound_backup_path": os.path.join(self.tmp, "backup", "KEYFOUND.txt"),
+        }
+        os.makedirs(os.path.join(self.tmp, "backup"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _worker(self, engine, pool=None, worker_id=None, **settings):
+        self.pool = pool or FakePool()
+        self.clock = FakeClock()
+        return script.PoolWorker(
+            dict(self.settings, **settings),
+            workdir=os.path.join(self.tmp, "work"),
+            http=self.pool,
+            engine=engine,
+            clock=self.clock,
+            worker_id=worker_id,
+        )
+
+    def test_cycle_fires_hooks_and_submits_the_block_in_one_batch(self):
+        engine = FakeEngine([(f"1Key{i}", _key(i)) for i in range(12)])
+        worker = self._worker(engine, worker_id="rig-2")
+        events = []
+        for event in worker.HOOKS:
+            worker.on(event, lambda w, *args, event=event: events.append(event))
+
+        self.assertEqual(worker.run(max_blocks=1), 1)
+
+        self.assertEqual(events[:3], ["block_leased", "engine_progress", "keys_parsed"])
+        self.assertEqual(events[3:], ["submitted"])
+        self.assertEqual(self.pool.leases, [{"workerId": "rig-2"}])
+        self.assertEqual(self.pool.submits, [{"privateKeys": [_key(i) for i in range(12)], "workerId": "rig-2", "blockId": 1}])
+        self.assertEqual(worker.pending, [])
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_command_matches_cli_builder_on_multi_gpu_rigs(self):
+        engine = FakeEngine()
+        worker = self._worker(engine, gpu_count=2, auto_switch=True, bitcrack_path="/opt/BitCrack", block_length="1B")
+        worker.run(max_blocks=1)
+
+        command = engine.commands[0]
+        self.assertEqual(command[0], "/opt/VanitySearch")
+        self.assertIn("-gpu", command)
+        self.assertNotIn("-gpuId", command)
+        keyspace = f"{BLOCK_START:x}:{BLOCK_END:x}"
+        expected = script._build_engine_command("vanity", keyspace, worker.config, worker.in_file, worker.out_file)
+        self.assertEqual(command, expected)
+
+    def test_failed_scans_back_off_and_queue_no_partial_block(self):
+        engine = FakeEngine([(f"1Key{i}", _key(i)) for i in range(4)], code=1)
+        worker = self._worker(engine, backoff_base_seconds=10, backoff_max_seconds=600)
+        self.clock.on_sleep = lambda: len(self.clock.sleeps) >= 4 and worker.stop()
+
+        worker.run()
+
+        self.assertEqual(len(self.pool.leases), 4)
+        self.assertEqual(len(self.clock.sleeps), 4)
+        self.assertTrue(all(delay >= 5 for delay in self.clock.sleeps))
+        self.assertEqual(worker.retry_streak, 4)
+        self.assertEqual(worker.blocks_done, 0)
+        self.assertEqual(self.pool.submits, [])
+        self.assertEqual(worker.pending, [])
+
+    def test_rejected_batch_is_dropped_not_retried(self):
+        engine = FakeEngine([(f"1Key{i}", _key(i)) for i in range(10)])
+        worker = self._worker(engine, pool=FakePool(reject=True), worker_id="rig-2")
+
+        worker.run(max_blocks=1)
+
+        self.assertEqual(len(self.pool.submits), 1)
+        self.assertEqual(worker.pending, [])
+        with open(worker.pending_file, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_hits_from_addresses_file_are_persisted_with_backup(self):
+        addresses_file = os.path.join(self.tmp, "targets.txt")
+        with open(addresses_file, "w", encoding="utf-8") as f:
+            f.write(f"# watch list\n{TARGET}\n")
+        hit = (TARGET, _key(1))
+        engine = FakeEngine([hit] + [(f"1Key{i}", _key(i)) for i in range(2, 12)])
+        worker = self._worker(engine, additional_addresses_file=addresses_file)
+
+        worker.run()
+
+        self.assertEqual(worker.found, [hit])
+        with open(worker.in_file, encoding="utf-8") as f:
+            self.assertIn(TARGET, f.read().split())
+        for path in worker.keyfound_paths:
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), f"{TARGET}:{_key(1)}\n")
+        submitted = [k for body in self.pool.submits for k in body["privateKeys"]]
+        self.assertNotIn(_key(1), submitted)
+
+    def test_cpu_lane_alerts_saved_hits_once_and_submits_them_on_its_block(self):
+        hit = (TARGET, _key(1))
+        engine = FakeEngine([hit] + [(f"1Key{i}", _key(i)) for i in range(2, 12)])
+        worker = self._worker(engine, worker_id="rig-cpu", additional_addresses=[TARGET])
+        lane = types.SimpleNamespace(client=types.SimpleNamespace(session=None), samples=[], threads=1)
+        worker.on("keys_parsed", lambda w, keys, hits: script.CpuLane._on_parsed(lane, w, keys, hits))
+        alerts = []
+        with mock.patch.object(script, "_send_hit_alert", lambda pairs, saved_to, session=None: alerts.append((pairs, saved_to)) or True), \
+                mock.patch.object(script, "KEYFOUND_SUBMIT_TO_POOL", True), \
+                mock.patch.object(script, "HANDLED_HITS", set()):
+            worker.run()
+
+        self.assertEqual(alerts, [([hit], worker.keyfound_paths)])
+        for path in worker.keyfound_paths:
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), f"{TARGET}:{_key(1)}\n")
+        self.assertEqual(self.pool.submits[0], {"privateKeys": [_key(1)], "workerId": "rig-cpu", "blockId": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
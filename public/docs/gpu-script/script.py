@@ -15,11 +15,22 @@ import shlex
 import re
 import uuid
 import hashlib
+import signal
+import atexit
+import queue
+import logging
+import logging.handlers
+import argparse
+import random
+import threading
+import shutil
+
+PROCESS_STARTED = time.time()
+
+_SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
 
 def _load_settings():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(base_dir, "settings.json")
-    with open(path, "r", encoding="utf-8") as f:
+    with open(_SETTINGS_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 _SETTINGS = _load_settings()
@@ -34,6 +45,9 @@ TELEGRAM_CHAT_ID = ""
 API_URL = ""
 POOL_TOKEN = ""
 ADDITIONAL_ADDRESSES = []
+ADDITIONAL_ADDRESSES_FILE = ""
+ADDITIONAL_ADDRESS_SET = frozenset()
+ADDITIONAL_HASH160_SET = frozenset()
 BLOCK_LENGTH = ""
 APP_PATH = ""
 APP_ARGS = ""
@@ -46,40 +60,169 @@ PROGRAM_BASE_COMMAND = []
 WORKER_NAME = ""
 
 ONE_SHOT = False
-POST_BLOCK_DELAY_SECONDS = 10
+POST_BLOCK_DELAY_SECONDS = 0
 POST_BLOCK_DELAY_ENABLED = True
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS = 600
+COORDINATOR_URL = ""
+WORK_EVENTS_URL = ""
+SHUTDOWN_MODE = "drain"
+SHUTDOWN_FLUSH_SECONDS = 60
+LOG_LEVEL = "INFO"
+LOG_FILE = ""
+LOG_MAX_MB = 10
+LOG_BACKUPS = 5
+LOG_CONSOLE = True
+THROUGHPUT_ALERT_PERCENT = 20
+THROUGHPUT_HISTORY_SIZE = 20
+KEYFOUND_BACKUP_PATH = ""
+KEYFOUND_SUBMIT_TO_POOL = False
+KEYFOUND_ALERT_INCLUDE_KEY = False
+WORKER_CONFIG = {}
+CPU_LANE_ENABLED = False
+CPU_LANE_PATH = ""
+CPU_LANE_THREADS = 0
+CPU_LANE_NICE = 10
+CPU_LANE_BLOCK_SECONDS = 600
+CPU_LANE_BLOCK_LENGTH = "10B"
 
 TELEGRAM_STATE_FILE = "telegram_state.json"
 STATUS_MESSAGE_ID = None
 LAST_MESSAGE_HASH = None
 
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58_ALPHABET)}
+
+def _address_hash160(addr):
+    """Return the 20-byte hash160 of a base58check (P2PKH/P2SH) address, or None."""
+    try:
+        n = 0
+        for c in addr:
+            n = n * 58 + _B58_INDEX[c]
+        raw = n.to_bytes(25, "big")
+        if hashlib.sha256(hashlib.sha256(raw[:21]).digest()).digest()[:4] != raw[21:]:
+            return None
+        return raw[1:21]
+    except Exception:
+        return None
+
+_EXTRAS_FILE_CACHE = {"key": None, "addresses": []}
+_EXTRAS_SETS_KEY = None
+
+def _read_addresses_file(path):
+    """
+    Read one address per line (blank lines and '#' comments ignored), cached
+    on (path, mtime, size) so large lists are only parsed when they change.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return []
+    key = (path, st.st_mtime_ns, st.st_size)
+    if _EXTRAS_FILE_CACHE["key"] == key:
+        return _EXTRAS_FILE_CACHE["addresses"]
+    out = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                a = line.split("#", 1)[0].strip()
+                if a:
+                    out.append(a)
+    except Exception:
+        return _EXTRAS_FILE_CACHE["addresses"] if _EXTRAS_FILE_CACHE["key"] and _EXTRAS_FILE_CACHE["key"][0] == path else []
+    _EXTRAS_FILE_CACHE["key"] = key
+    _EXTRAS_FILE_CACHE["addresses"] = out
+    return out
+
+def _target_sets(addresses):
+    """Return (address set, hash160 set) for matching engine output against target addresses."""
+    return frozenset(addresses), frozenset(h for h in (_address_hash160(a) for a in addresses) if h)
+
+def _rebuild_additional_sets():
+    global ADDITIONAL_ADDRESS_SET, ADDITIONAL_HASH160_SET, _EXTRAS_SETS_KEY
+    key = (len(ADDITIONAL_ADDRESSES), hash(tuple(ADDITIONAL_ADDRESSES)))
+    if key == _EXTRAS_SETS_KEY:
+        return
+    ADDITIONAL_ADDRESS_SET, ADDITIONAL_HASH160_SET = _target_sets(ADDITIONAL_ADDRESSES)
+    _EXTRAS_SETS_KEY = key
+
+def _worker_config(s):
+    """
+    Parse the settings that drive one lease/scan/submit loop (pool, engine,
+    targets, backoff) into a dict. _apply_settings() publishes it as the
+    module globals and WORKER_CONFIG; PoolWorker keeps its own copy.
+    """
+    addrs = s.get("additional_addresses", [])
+    if isinstance(addrs, list):
+        addresses = [a for a in addrs if isinstance(a, str) and a.strip()]
+    else:
+        addresses = []
+    legacy_addr = s.get("additional_address", "")
+    if isinstance(legacy_addr, str) and legacy_addr.strip() and legacy_addr not in addresses:
+        addresses.append(legacy_addr)
+    addresses_file = str(s.get("additional_addresses_file", "") or "").strip()
+    if addresses_file:
+        addresses = list(dict.fromkeys(addresses + _read_addresses_file(addresses_file)))
+    try:
+        backoff_base = max(1, int(float(s.get("backoff_base_seconds", 15))))
+    except Exception:
+        backoff_base = 15
+    try:
+        backoff_max = max(backoff_base, int(float(s.get("backoff_max_seconds", 600))))
+    except Exception:
+        backoff_max = max(backoff_base, 600)
+    return {
+        "api_url": s.get("api_url", ""),
+        "pool_token": s.get("user_token", ""),
+        "worker_name": s.get("worker_name", "") or s.get("workername", ""),
+        "block_length": s.get("block_length", ""),
+        "app_path": s.get("vanitysearch_path", s.get("app_path", "")),
+        "app_args": s.get("vanitysearch_arguments", s.get("app_arguments", "")),
+        "gpu_index": str(s.get("gpu_index", 0)),
+        "gpu_count": int(s.get("gpu_count", 1) or 1),
+        "bitcrack_path": s.get("bitcrack_path", ""),
+        "bitcrack_args": s.get("bitcrack_arguments", ""),
+        "auto_switch": bool(s.get("auto_switch", False)),
+        "one_shot": bool(s.get("oneshot", False)),
+        "backoff_base": backoff_base,
+        "backoff_max": backoff_max,
+        "additional_addresses": addresses,
+        "additional_addresses_file": addresses_file,
+        "keyfound_backup_path": str(s.get("keyfound_backup_path", "") or "").strip() or os.path.join(os.path.expanduser("~"), "united_pool_KEYFOUND.txt"),
+        "cpu_threads": 0,
+    }
+
 def _apply_settings(s):
     global TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, API_URL, POOL_TOKEN, ADDITIONAL_ADDRESSES, BLOCK_LENGTH
+    global ADDITIONAL_ADDRESSES_FILE
     global APP_PATH, APP_ARGS, GPU_INDEX, PROGRAM_BASE_COMMAND, WORKER_NAME, ONE_SHOT
     global BITCRACK_PATH, BITCRACK_ARGS, AUTO_SWITCH, GPU_COUNT
     global POST_BLOCK_DELAY_SECONDS, POST_BLOCK_DELAY_ENABLED
+    global BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS, COORDINATOR_URL, WORK_EVENTS_URL
+    global SHUTDOWN_MODE, SHUTDOWN_FLUSH_SECONDS
+    global LOG_LEVEL, LOG_FILE, LOG_MAX_MB, LOG_BACKUPS, LOG_CONSOLE
+    global THROUGHPUT_ALERT_PERCENT, THROUGHPUT_HISTORY_SIZE
+    global KEYFOUND_BACKUP_PATH, KEYFOUND_SUBMIT_TO_POOL, KEYFOUND_ALERT_INCLUDE_KEY
+    global CPU_LANE_ENABLED, CPU_LANE_PATH, CPU_LANE_THREADS, CPU_LANE_NICE, CPU_LANE_BLOCK_SECONDS, CPU_LANE_BLOCK_LENGTH
+    global WORKER_CONFIG
     TELEGRAM_BOT_TOKEN = s.get("telegram_accesstoken", "")
     TELEGRAM_CHAT_ID = str(s.get("telegram_chatid", ""))
-    API_URL = s.get("api_url", "")
-    POOL_TOKEN = s.get("user_token", "")
-    addrs = s.get("additional_addresses", [])
-    if isinstance(addrs, list):
-        ADDITIONAL_ADDRESSES = [a for a in addrs if isinstance(a, str) and a.strip()]
-    else:
-        ADDITIONAL_ADDRESSES = []
-    legacy_addr = s.get("additional_address", "")
-    if isinstance(legacy_addr, str) and legacy_addr.strip() and legacy_addr not in ADDITIONAL_ADDRESSES:
-        ADDITIONAL_ADDRESSES.append(legacy_addr)
-    BLOCK_LENGTH = s.get("block_length", "")
-    APP_PATH = s.get("vanitysearch_path", s.get("app_path", ""))
-    APP_ARGS = s.get("vanitysearch_arguments", s.get("app_arguments", ""))
-    GPU_INDEX = str(s.get("gpu_index", 0))
-    GPU_COUNT = int(s.get("gpu_count", 1) or 1)
-    WORKER_NAME = s.get("worker_name", "") or s.get("workername", "")
-    ONE_SHOT = bool(s.get("oneshot", False))
-    BITCRACK_PATH = s.get("bitcrack_path", "")
-    BITCRACK_ARGS = s.get("bitcrack_arguments", "")
-    AUTO_SWITCH = bool(s.get("auto_switch", False))
+    WORKER_CONFIG = cfg = _worker_config(s)
+    API_URL = cfg["api_url"]
+    POOL_TOKEN = cfg["pool_token"]
+    ADDITIONAL_ADDRESSES = cfg["additional_addresses"]
+    ADDITIONAL_ADDRESSES_FILE = cfg["additional_addresses_file"]
+    _rebuild_additional_sets()
+    BLOCK_LENGTH = cfg["block_length"]
+    APP_PATH = cfg["app_path"]
+    APP_ARGS = cfg["app_args"]
+    GPU_INDEX = cfg["gpu_index"]
+    GPU_COUNT = cfg["gpu_count"]
+    WORKER_NAME = cfg["worker_name"]
+    ONE_SHOT = cfg["one_shot"]
+    BITCRACK_PATH = cfg["bitcrack_path"]
+    BITCRACK_ARGS = cfg["bitcrack_args"]
+    AUTO_SWITCH = cfg["auto_switch"]
     PROGRAM_BASE_COMMAND = [
         APP_PATH,
         "-t", "0",
@@ -103,23 +246,91 @@ def _apply_settings(s):
                     dm = 0
                 POST_BLOCK_DELAY_SECONDS = int(dm * 60)
             else:
-                POST_BLOCK_DELAY_SECONDS = 10
+                POST_BLOCK_DELAY_SECONDS = 0
         except Exception:
-            POST_BLOCK_DELAY_SECONDS = 10
+            POST_BLOCK_DELAY_SECONDS = 0
     else:
         POST_BLOCK_DELAY_SECONDS = 0
+    BACKOFF_BASE_SECONDS = cfg["backoff_base"]
+    BACKOFF_MAX_SECONDS = cfg["backoff_max"]
+    COORDINATOR_URL = str(s.get("coordinator_url", "") or "").strip().rstrip("/")
+    WORK_EVENTS_URL = str(s.get("work_events_url", "") or "").strip()
+    mode = str(s.get("shutdown_mode", "drain") or "drain").strip().lower()
+    SHUTDOWN_MODE = mode if mode in ("drain", "checkpoint") else "drain"
+    try:
+        SHUTDOWN_FLUSH_SECONDS = max(0, int(float(s.get("shutdown_flush_seconds", 60))))
+    except Exception:
+        SHUTDOWN_FLUSH_SECONDS = 60
+    LOG_LEVEL = str(s.get("log_level", "INFO") or "INFO").strip().upper()
+    LOG_FILE = str(s.get("log_file", "") or "").strip()
+    try:
+        LOG_MAX_MB = max(1, float(s.get("log_max_mb", 10)))
+    except Exception:
+        LOG_MAX_MB = 10
+    try:
+        LOG_BACKUPS = max(0, int(s.get("log_backups", 5)))
+    except Exception:
+        LOG_BACKUPS = 5
+    LOG_CONSOLE = bool(s.get("log_console", True))
+    try:
+        THROUGHPUT_ALERT_PERCENT = min(95.0, max(1.0, float(s.get("throughput_alert_percent", 20))))
+    except Exception:
+        THROUGHPUT_ALERT_PERCENT = 20
+    try:
+        THROUGHPUT_HISTORY_SIZE = max(3, int(s.get("throughput_history_size", 20)))
+    except Exception:
+        THROUGHPUT_HISTORY_SIZE = 20
+    KEYFOUND_BACKUP_PATH = cfg["keyfound_backup_path"]
+    KEYFOUND_SUBMIT_TO_POOL = bool(s.get("keyfound_submit_to_pool", False))
+    KEYFOUND_ALERT_INCLUDE_KEY = bool(s.get("keyfound_alert_include_key", False))
+    CPU_LANE_ENABLED = bool(s.get("cpu_lane_enabled", False))
+    CPU_LANE_PATH = str(s.get("cpu_lane_path", "") or "").strip() or APP_PATH
+    try:
+        CPU_LANE_THREADS = max(0, int(s.get("cpu_lane_threads", 0)))
+    except Exception:
+        CPU_LANE_THREADS = 0
+    try:
+        CPU_LANE_NICE = min(19, max(0, int(s.get("cpu_lane_nice", 10))))
+    except Exception:
+        CPU_LANE_NICE = 10
+    try:
+        CPU_LANE_BLOCK_SECONDS = max(60, int(float(s.get("cpu_lane_block_seconds", 600))))
+    except Exception:
+        CPU_LANE_BLOCK_SECONDS = 600
+    CPU_LANE_BLOCK_LENGTH = str(s.get("cpu_lane_block_length", "10B") or "10B").strip()
 
-def refresh_settings():
-    s = _load_settings()
-    _apply_settings(s)
+def _settings_stamp():
+    stamp = []
+    for path in (_SETTINGS_PATH, ADDITIONAL_ADDRESSES_FILE):
+        if not path:
+            continue
+        try:
+            st = os.stat(path)
+            stamp.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((path, None, None))
+    return tuple(stamp)
+
+def refresh_settings(force=False):
+    """Re-apply settings.json; skipped while neither it nor the address file changed."""
+    global _SETTINGS_STAMP
+    stamp = _settings_stamp()
+    if force or stamp != _SETTINGS_STAMP:
+        _apply_settings(_load_settings())
+        _SETTINGS_STAMP = stamp
+    _configure_logging()
 
 _apply_settings(_SETTINGS)
+_SETTINGS_STAMP = _settings_stamp()
 
 # Initialize colorama
 init(autoreset=True)
 
-PENDING_KEYS = []
+# One {"block_id", "keys"} entry per scanned block; the pool needs all of a block's
+# checkwork keys in one submission, so batches never mix blocks.
+PENDING_BATCHES = []
 previous_keyspace = None
+CURRENT_BLOCK_ID = None
 CURRENT_ADDR_COUNT = 10
 CURRENT_RANGE_START = None
 CURRENT_RANGE_END = None
@@ -127,6 +338,17 @@ PENDING_KEYS_FILE = "pending_keys.json"
 LAST_POST_ATTEMPT = 0
 ALL_BLOCKS_SOLVED = False
 PROCESSED_ONE_BLOCK = False
+POOL_RETRY_AFTER = 0
+RETRY_STREAKS = {"fetch": 0, "submit": 0}
+SHUTDOWN_REQUESTED = False
+SHUTDOWN_NOW = False
+SHUTDOWN_ANNOUNCED = False
+RELOAD_REQUESTED = False
+ENGINE_PROCESS = None
+CPU_LANE = None
+STARTUP_FLUSH = None
+STARTUP_FLUSH_BLOCKS = frozenset()
+STARTUP_FLUSH_SECONDS = 60
 
 STATUS = {
     "worker": "",
@@ -142,67 +364,132 @@ STATUS = {
     "updated_at": "",
 }
 
+def _atomic_write_json(path, data):
+    """Write JSON via a fsynced temp file and os.replace so a crash never leaves a torn file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _read_pending_batches(path):
+    """Load {"block_id", "keys"} entries from a pending keys file; [] when missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return []
+    if not isinstance(data, list):
+        return []
+    batches = [e for e in data if isinstance(e, dict) and e.get("keys")]
+    # Older runs stored a flat key list without block ids; submit it in pool-sized chunks.
+    legacy = [k for k in data if isinstance(k, str)]
+    batches += [{"block_id": None, "keys": legacy[i:i + 30]} for i in range(0, len(legacy), 30)]
+    return batches
+
 def _load_pending_keys():
-    global PENDING_KEYS
+    global PENDING_BATCHES
+    PENDING_BATCHES = _read_pending_batches(PENDING_KEYS_FILE)
+
+def _save_pending_keys():
     try:
-        if os.path.exists(PENDING_KEYS_FILE):
-            with open(PENDING_KEYS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    PENDING_KEYS = data
+        _atomic_write_json(PENDING_KEYS_FILE, PENDING_BATCHES)
     except Exception:
         pass
 
-def _save_pending_keys():
+def _pending_key_count():
+    return sum(len(e["keys"]) for e in PENDING_BATCHES)
+
+# ----------------------------------------------------------------------------------------------
+
+def _handle_shutdown_signal(signum, frame):
+    global SHUTDOWN_REQUESTED, SHUTDOWN_NOW
+    # First signal drains (or checkpoints, per shutdown_mode); a second one always checkpoints.
+    if SHUTDOWN_REQUESTED or SHUTDOWN_MODE == "checkpoint" or signum == signal.SIGINT:
+        SHUTDOWN_NOW = True
+        _stop_engine()
+    SHUTDOWN_REQUESTED = True
+
+def _handle_reload_signal(signum, frame):
+    global RELOAD_REQUESTED
+    RELOAD_REQUESTED = True
+
+def _install_signal_handlers():
+    signal.signal(signal.SIGINT, _handle_shutdown_signal)
+    signal.signal(signal.SIGTERM, _handle_shutdown_signal)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _handle_reload_signal)
+
+def _stop_engine():
+    if CPU_LANE is not None:
+        CPU_LANE.stop()
+    proc = ENGINE_PROCESS
     try:
-        with open(PENDING_KEYS_FILE, "w", encoding="utf-8") as f:
-            json.dump(PENDING_KEYS, f)
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
     except Exception:
         pass
 
-def _retry_pending_keys_now():
-    global PENDING_KEYS
-    posted = False
-    required = max(10, min(30, int(CURRENT_ADDR_COUNT or 10)))
-    while len(PENDING_KEYS) >= required:
-        batch = PENDING_KEYS[:required]
-        _res = post_private_keys(batch)
-        _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-        _incomp = _res[1] if isinstance(_res, tuple) else False
-        if _ok:
-            PENDING_KEYS = PENDING_KEYS[required:]
-            posted = True
-            _save_pending_keys()
+def _poll_control_flags():
+    """Act on signal flags from normal control flow (handlers only set them)."""
+    global RELOAD_REQUESTED, SHUTDOWN_ANNOUNCED
+    if RELOAD_REQUESTED:
+        RELOAD_REQUESTED = False
+        try:
+            refresh_settings(force=True)
+            logger("Info", "Settings reloaded (SIGHUP). Engine changes apply from the next block.")
+        except Exception as e:
+            logger("Error", f"Settings reload failed, keeping previous settings: {e}")
+    if SHUTDOWN_REQUESTED and not SHUTDOWN_ANNOUNCED:
+        SHUTDOWN_ANNOUNCED = True
+        if SHUTDOWN_NOW:
+            logger("Warning", "Shutdown requested. Checkpointing current block and stopping.")
         else:
-            if _incomp:
-                PENDING_KEYS = []
-                _save_pending_keys()
-                break
-            else:
-                _save_pending_keys()
-                break
-    # If we have some keys but fewer than required, try filling with randoms in current range
-    if not posted and 0 < len(PENDING_KEYS) < required and CURRENT_RANGE_START and CURRENT_RANGE_END:
-        fillers = _generate_filler_keys(required - len(PENDING_KEYS), CURRENT_RANGE_START, CURRENT_RANGE_END, exclude=PENDING_KEYS)
-        batch = PENDING_KEYS + fillers
-        if len(batch) == required:
-            _res = post_private_keys(batch)
-            _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-            _incomp = _res[1] if isinstance(_res, tuple) else False
-            if _ok:
-                PENDING_KEYS = []
-                posted = True
-                _save_pending_keys()
-            elif _incomp:
-                PENDING_KEYS = []
-                _save_pending_keys()
-    return posted
+            logger("Warning", "Shutdown requested. Finishing current block first (signal again to checkpoint now).")
+
+def _interruptible_sleep(seconds):
+    """Sleep in short slices; returns False early if shutdown was requested."""
+    end = time.time() + max(0, seconds)
+    while True:
+        _poll_control_flags()
+        if SHUTDOWN_REQUESTED:
+            return False
+        remaining = end - time.time()
+        if remaining <= 0:
+            return True
+        time.sleep(min(1.0, remaining))
+
+def _wait_before_retry(deadline=None):
+    """Wait before the next submit retry; False when the caller should stop retrying."""
+    wait = _retry_delay("submit")
+    if deadline is None:
+        return _interruptible_sleep(wait)
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return False
+    time.sleep(min(wait, remaining))
+    return time.time() < deadline
+
+def graceful_shutdown():
+    """Flush pending submissions within shutdown_flush_seconds and persist state."""
+    if PENDING_BATCHES:
+        logger("Info", f"Flushing {_pending_key_count()} pending key(s) (up to {SHUTDOWN_FLUSH_SECONDS}s).")
+        flush_pending_keys_blocking(deadline=time.time() + SHUTDOWN_FLUSH_SECONDS)
+    _save_pending_keys()
+    if PENDING_BATCHES:
+        logger("Warning", f"{_pending_key_count()} key(s) left in '{PENDING_KEYS_FILE}' for the next run.")
+    update_status({"pending_keys": _pending_key_count(), "last_error": "Worker stopped", "next_fetch_in": 0})
+    logger("Info", "Worker state saved. Bye.")
+
+def _retry_pending_keys_now():
+    """Post pending batches once, stopping at the first one that fails."""
+    return flush_pending_keys_blocking(deadline=time.time())
 
 def _scheduled_pending_post_retry():
     global LAST_POST_ATTEMPT
     now = time.time()
-    required = max(10, min(30, int(CURRENT_ADDR_COUNT or 10)))
-    if now - LAST_POST_ATTEMPT >= 30 and len(PENDING_KEYS) >= required:
+    if now - LAST_POST_ATTEMPT >= 30 and PENDING_BATCHES:
         LAST_POST_ATTEMPT = now
         ok = _retry_pending_keys_now()
         if ok:
@@ -210,47 +497,63 @@ def _scheduled_pending_post_retry():
         else:
             logger("Warning", "API unavailable. Keeping keys and retrying in 30s.")
 
-def flush_pending_keys_blocking():
-    global PENDING_KEYS
+def flush_pending_keys_blocking(deadline=None, session=None):
+    """
+    Post pending batches oldest first, each with its own blockId, retrying
+    until `deadline`. Batches the pool rejects for good (missing keys, block
+    expired or completed) are dropped. Callers off the main thread pass their
+    own requests `session`.
+    """
+    global PENDING_BATCHES
     posted = False
-    required = max(10, min(30, int(CURRENT_ADDR_COUNT or 10)))
-    while len(PENDING_KEYS) >= required:
-        batch = PENDING_KEYS[:required]
-        _res = post_private_keys(batch)
-        _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-        _incomp = _res[1] if isinstance(_res, tuple) else False
-        if _ok:
-            PENDING_KEYS = PENDING_KEYS[required:]
-            posted = True
+    while PENDING_BATCHES:
+        entry = PENDING_BATCHES[0]
+        ok, rejected = post_private_keys(entry["keys"], session=session, block_id=entry.get("block_id"))
+        if ok or rejected:
+            if rejected:
+                logger("Warning", f"Dropping {len(entry['keys'])} key(s) for block {entry.get('block_id') or '-'} the pool will not accept.")
+            PENDING_BATCHES = PENDING_BATCHES[1:]
+            posted = posted or ok
             _save_pending_keys()
-        else:
-            if _incomp:
-                PENDING_KEYS = []
-                _save_pending_keys()
-                break
-            else:
-                _save_pending_keys()
-                time.sleep(30)
-    # Try a final post with fillers if we have some keys but fewer than required
-    if not posted and 0 < len(PENDING_KEYS) < required and CURRENT_RANGE_START and CURRENT_RANGE_END:
-        fillers = _generate_filler_keys(required - len(PENDING_KEYS), CURRENT_RANGE_START, CURRENT_RANGE_END, exclude=PENDING_KEYS)
-        batch = PENDING_KEYS + fillers
-        if len(batch) == required:
-            _res = post_private_keys(batch)
-            _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-            _incomp = _res[1] if isinstance(_res, tuple) else False
-            if _ok:
-                PENDING_KEYS = []
-                posted = True
-                _save_pending_keys()
-            else:
-                if _incomp:
-                    PENDING_KEYS = []
-                    _save_pending_keys()
-                else:
-                    time.sleep(30)
+            continue
+        _save_pending_keys()
+        if not _wait_before_retry(deadline):
+            break
     return posted
 
+def _start_startup_flush():
+    """
+    Submit keys left by the previous run on a background thread while the
+    first block is fetched. Their block ids are noted so a fetch that hands
+    one of those blocks back waits for the flush instead of rescanning it.
+    """
+    global STARTUP_FLUSH, STARTUP_FLUSH_BLOCKS
+    STARTUP_FLUSH_BLOCKS = frozenset(e.get("block_id") for e in PENDING_BATCHES if e.get("block_id"))
+    logger("Info", f"Flushing {_pending_key_count()} pending key(s) from the previous run in the background.")
+    STARTUP_FLUSH = threading.Thread(
+        target=_run_startup_flush,
+        args=(time.time() + STARTUP_FLUSH_SECONDS,),
+        name="startup-flush",
+        daemon=True,
+    )
+    STARTUP_FLUSH.start()
+
+def _run_startup_flush(deadline):
+    # Own session: requests.Session is not safe to share with the main loop's fetches.
+    with requests.Session() as session:
+        flush_pending_keys_blocking(deadline, session=session)
+
+def _join_startup_flush():
+    """Wait for the startup flush; PENDING_BATCHES is only touched by one thread at a time."""
+    global STARTUP_FLUSH
+    if STARTUP_FLUSH is not None:
+        STARTUP_FLUSH.join()
+        STARTUP_FLUSH = None
+
+def _is_flushing_block(block_id):
+    """True when the pool handed back a block whose keys the startup flush is still submitting."""
+    return STARTUP_FLUSH is not None and block_id is not None and block_id in STARTUP_FLUSH_BLOCKS
+
 def handle_next_block_immediately():
     refresh_settings()
     data = fetch_block_data()
@@ -265,7 +568,8 @@ def handle_next_block_immediately():
     previous_keyspace = keyspace
     # Track current dynamic requirements
     try:
-        global CURRENT_ADDR_COUNT, CURRENT_RANGE_START, CURRENT_RANGE_END
+        global CURRENT_BLOCK_ID, CURRENT_ADDR_COUNT, CURRENT_RANGE_START, CURRENT_RANGE_END
+        CURRENT_BLOCK_ID = data.get("id")
         CURRENT_ADDR_COUNT = int(len(addresses) or 10)
         CURRENT_RANGE_START = start_hex
         CURRENT_RANGE_END = end_hex
@@ -278,13 +582,32 @@ def handle_next_block_immediately():
 #                                    UTILITY & COMMUNICATION FUNCTIONS
 # ==============================================================================================
 
-def logger(level, message):
-    """
-    Print a message with timestamp and colored log level.
-    """
-    current_time = datetime.now()
-    formatted_time = current_time.strftime("[%Y-%m-%d.%H:%M:%S]")
-    
+# Labels used by logger() mapped onto stdlib levels; SUCCESS and KEYFOUND get their own.
+SUCCESS_LEVEL = 25
+KEYFOUND_LEVEL = 45
+logging.addLevelName(SUCCESS_LEVEL, "SUCCESS")
+logging.addLevelName(KEYFOUND_LEVEL, "KEYFOUND")
+_LABEL_LEVELS = {
+    "Info": logging.INFO,
+    "Timer": logging.INFO,
+    "Warning": logging.WARNING,
+    "Error": logging.ERROR,
+    "Success": SUCCESS_LEVEL,
+    "KEYFOUND": KEYFOUND_LEVEL,
+    "KEYFOUND Error": KEYFOUND_LEVEL,
+}
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Fields merged into every structured record (block_id, engine, phase, ...).
+LOG_CONTEXT = {}
+
+_LOG = logging.getLogger("united.worker")
+_LOG.propagate = False
+_LOG_QUEUE = queue.SimpleQueue()
+_LOG_LISTENER = None
+_LOG_CONFIG_KEY = None
+
+class _ConsoleFormatter(logging.Formatter):
     color_map = {
         "Info": Fore.LIGHTBLUE_EX,
         "Warning": Fore.LIGHTYELLOW_EX,
@@ -293,9 +616,93 @@ def logger(level, message):
         "KEYFOUND": Fore.LIGHTMAGENTA_EX,
         "Timer": Fore.LIGHTYELLOW_EX
     }
-    
-    color = color_map.get(level, Fore.WHITE)
-    print(f"{formatted_time} {color}[{level}]{Style.RESET_ALL} {message}")
+
+    def format(self, record):
+        if getattr(record, "engine_line", False):
+            return f"{Fore.CYAN}  > {record.getMessage()}{Style.RESET_ALL}"
+        label = getattr(record, "label", record.levelname.title())
+        formatted_time = time.strftime("[%Y-%m-%d.%H:%M:%S]", time.localtime(record.created))
+        color = self.color_map.get(label, Fore.WHITE)
+        return f"{formatted_time} {color}[{label}]{Style.RESET_ALL} {record.getMessage()}"
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": getattr(record, "label", record.levelname.title()),
+            "msg": _ANSI_RE.sub("", record.getMessage()),
+            "worker": WORKER_NAME or "default",
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, default=str)
+
+class _NoEngineLines(logging.Filter):
+    def filter(self, record):
+        return not getattr(record, "engine_line", False)
+
+def _stop_logging():
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        for h in _LOG_LISTENER.handlers:
+            try:
+                h.close()
+            except Exception:
+                pass
+        _LOG_LISTENER = None
+
+def _configure_logging():
+    """
+    (Re)build the logging pipeline when log settings change. Callers only
+    enqueue records; the console and rotating JSON file sinks run on the
+    listener thread so terminal or disk stalls never block the main loop.
+    """
+    global _LOG_LISTENER, _LOG_CONFIG_KEY
+    key = (LOG_LEVEL, LOG_FILE, LOG_MAX_MB, LOG_BACKUPS, LOG_CONSOLE)
+    if key == _LOG_CONFIG_KEY and _LOG_LISTENER is not None:
+        return
+    _stop_logging()
+    handlers = []
+    if LOG_CONSOLE:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(_ConsoleFormatter())
+        handlers.append(console)
+    if LOG_FILE:
+        try:
+            sink = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=int(LOG_MAX_MB * 1024 * 1024), backupCount=LOG_BACKUPS, encoding="utf-8"
+            )
+            sink.setFormatter(_JsonFormatter())
+            sink.addFilter(_NoEngineLines())
+            handlers.append(sink)
+        except Exception as e:
+            print(f"Could not open log file '{LOG_FILE}': {e}")
+    _LOG.handlers = [logging.handlers.QueueHandler(_LOG_QUEUE)]
+    level = logging.getLevelName(LOG_LEVEL)
+    _LOG.setLevel(level if isinstance(level, int) else logging.INFO)
+    _LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, *handlers, respect_handler_level=True)
+    _LOG_LISTENER.start()
+    _LOG_CONFIG_KEY = key
+
+atexit.register(_stop_logging)
+
+def logger(level, message, **fields):
+    """
+    Log a message under a label ("Info", "Success", "KEYFOUND", ...).
+    Keyword fields (duration, phase, ...) plus LOG_CONTEXT are added to the
+    structured JSON record written by the file sink.
+    """
+    if _LOG_LISTENER is None:
+        _configure_logging()
+    record_fields = dict(LOG_CONTEXT)
+    record_fields.update(fields)
+    _LOG.log(_LABEL_LEVELS.get(level, logging.INFO), message, extra={"label": level, "fields": record_fields})
+
+def engine_output(line):
+    """Queue one line of engine output for the console sink."""
+    if _LOG_LISTENER is None:
+        _configure_logging()
+    _LOG.info(line, extra={"engine_line": True, "label": "Engine"})
 
 # ----------------------------------------------------------------------------------------------
 
@@ -312,8 +719,7 @@ def _load_telegram_state():
 
 def _save_telegram_state(state):
     try:
-        with open(TELEGRAM_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f)
+        _atomic_write_json(TELEGRAM_STATE_FILE, state)
     except Exception:
         pass
 
@@ -485,6 +891,11 @@ def _format_status_html():
     last_error = _escape_html(STATUS.get("last_error", "-"))
     keyfound = _escape_html(STATUS.get("keyfound", "-"))
     next_in = STATUS.get("next_fetch_in", 0)
+    engine_startup = _escape_html(STATUS.get("engine_startup", "-"))
+    throughput = _escape_html(STATUS.get("throughput", "-"))
+    cpu_lane = STATUS.get("cpu_lane")
+    engine = STATUS.get("engine")
+    first_hash = _escape_html(STATUS.get("first_hash", "-"))
     ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     lines = [
@@ -501,8 +912,15 @@ def _format_status_html():
         f"❗ <b>Last Error</b>: <i>{last_error}</i>",
         f"🔑 <b>Keyfound</b>: <code>{keyfound}</code>",
         f"⏱️ <b>Next Fetch</b>: <code>{next_in}s</code>",
+        f"🚀 <b>Engine Startup</b>: <code>{engine_startup}</code>",
+        f"⚡ <b>Throughput</b>: <code>{throughput}</code>",
+        f"🟢 <b>First Hash</b>: <code>{first_hash}</code>",
         f"🕒 <i>Updated {ts}</i>",
     ]
+    if engine:
+        lines.insert(-3, f"🛠️ <b>Engine</b>: <code>{_escape_html(engine)}</code>")
+    if cpu_lane:
+        lines.insert(-1, f"🧮 <b>CPU Lane</b>: <code>{_escape_html(cpu_lane)}</code>")
     if STATUS.get("all_blocks_solved", False):
         lines.append("🏁 <b>All blocks solved</b> ✅")
     return "\n".join(lines)
@@ -530,14 +948,20 @@ def _format_duration(seconds):
         parts.append(f"{s} sec" + ("s" if s != 1 else ""))
     return " ".join(parts)
 
+_STATUS_LOCK = threading.RLock()
+
 def update_status(fields=None):
-    if fields:
-        for k, v in fields.items():
-            STATUS[k] = v
-    if not STATUS.get("gpu"):
-        STATUS["gpu"] = str(GPU_INDEX)
-    STATUS["updated_at"] = datetime.now().isoformat(timespec="seconds")
-    edit_telegram_status(_format_status_html())
+    # Serialized: background threads (startup flush, CPU lane) may report too.
+    with _STATUS_LOCK:
+        if fields:
+            for k, v in fields.items():
+                STATUS[k] = v
+        if not STATUS.get("gpu"):
+            STATUS["gpu"] = str(GPU_INDEX)
+        STATUS["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        if COORDINATOR_URL and _coordinator_report_status():
+            return
+        edit_telegram_status(_format_status_html())
 
 def update_status_rl(fields, category, min_interval):
     now = time.time()
@@ -559,6 +983,261 @@ def send_telegram_notification_rl(message, category, min_interval):
     LAST_TELEGRAM_TS[category] = now
     send_telegram_notification(message)
 
+# ----------------------------------------------------------------------------------------------
+
+HTTP_SESSION = requests.Session()
+# Coordinator status reports run under _STATUS_LOCK from any thread, so they share one session of their own.
+_STATUS_SESSION = requests.Session()
+
+class _CoordinatorResponse:
+    """Response relayed by coordinator.py, shaped like the parts of requests.Response we use."""
+
+    def __init__(self, payload):
+        self.status_code = int(payload.get("status_code") or 0)
+        self.headers = payload.get("headers") or {}
+        self.text = payload.get("text") or ""
+
+    def json(self):
+        return json.loads(self.text)
+
+def _worker_id():
+    return f"{WORKER_NAME or 'default'}:{os.getpid()}"
+
+def _coordinator_call(path, payload, timeout, session=None):
+    r = (session or HTTP_SESSION).post(f"{COORDINATOR_URL}{path}", json=payload, timeout=timeout)
+    if r.status_code != 200:
+        raise requests.HTTPError(f"coordinator returned {r.status_code}")
+    return r.json()
+
+def _coordinator_register(session=None):
+    if not COORDINATOR_URL:
+        return False
+    try:
+        _coordinator_call("/register", {"worker": _worker_id(), "pid": os.getpid(), "gpu": GPU_INDEX}, timeout=5, session=session)
+        logger("Success", f"Registered with coordinator at {COORDINATOR_URL}")
+        return True
+    except (requests.RequestException, ValueError):
+        logger("Warning", f"Coordinator at {COORDINATOR_URL} unreachable; running standalone.")
+        return False
+
+def _coordinator_report_status():
+    try:
+        safe = {k: v for k, v in STATUS.items() if isinstance(v, (str, int, float, bool)) or v is None}
+        _coordinator_call("/status", {"worker": _worker_id(), "status": safe}, timeout=5, session=_STATUS_SESSION)
+        return True
+    except (requests.RequestException, ValueError):
+        return False
+
+def _pool_request(method, url, session=None, **kwargs):
+    """
+    Send a pool API request, through the host coordinator when one is
+    configured (shared connections and rate budget), else directly over
+    `session` (HTTP_SESSION by default; other threads pass their own).
+    """
+    if COORDINATOR_URL:
+        timeout = float(kwargs.get("timeout") or 15)
+        payload = {
+            "worker": _worker_id(),
+            "method": method,
+            "url": url,
+            "headers": kwargs.get("headers"),
+            "params": kwargs.get("params"),
+            "json": kwargs.get("json"),
+            "timeout": timeout,
+        }
+        relayed = None
+        try:
+            relayed = _coordinator_call("/proxy", payload, timeout=timeout + 30, session=session)
+        except (requests.RequestException, ValueError):
+            logger("Warning", "Coordinator unreachable; contacting the pool directly.")
+        if relayed is not None:
+            if relayed.get("transport_error"):
+                raise requests.ConnectionError(f"{relayed.get('transport_error')}: {relayed.get('detail', '')}")
+            return _CoordinatorResponse(relayed)
+    return (session or HTTP_SESSION).request(method, url, **kwargs)
+
+def _parse_retry_after(response):
+    try:
+        raw = (response.headers or {}).get("Retry-After")
+        if raw is None:
+            return None
+        return max(0, int(float(str(raw).strip())))
+    except Exception:
+        return None
+
+def _note_pool_pressure(response=None):
+    """
+    Record a pressure signal from the pool (429, 409 no range, Retry-After).
+    The retry itself backs off through _retry_delay(); a Retry-After is kept
+    as the floor for that delay and for the next post-block wait.
+    """
+    global POOL_RETRY_AFTER
+    ra = _parse_retry_after(response) if response is not None else None
+    POOL_RETRY_AFTER = ra or 0
+
+def _clear_pool_pressure():
+    global POOL_RETRY_AFTER
+    POOL_RETRY_AFTER = 0
+
+def _is_pool_pressure(response):
+    if response.status_code == 429:
+        return True
+    return _parse_retry_after(response) is not None
+
+def _post_block_delay():
+    return max(POST_BLOCK_DELAY_SECONDS, POOL_RETRY_AFTER)
+
+def _jittered_backoff(streak, base, cap):
+    """Exponential in the failure streak, drawn from the upper half of the window (equal jitter)."""
+    ceiling = min(cap, base * (2 ** max(0, streak - 1)))
+    return random.uniform(ceiling / 2.0, ceiling)
+
+def _retry_delay(kind):
+    """
+    Seconds to wait after a failed fetch or submit. Each consecutive failure
+    doubles the window and the jitter keeps rigs from retrying in lockstep;
+    a pool Retry-After is always honoured.
+    """
+    RETRY_STREAKS[kind] = RETRY_STREAKS.get(kind, 0) + 1
+    delay = _jittered_backoff(RETRY_STREAKS[kind], BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS)
+    return round(max(delay, POOL_RETRY_AFTER), 1)
+
+def _reset_retry(kind):
+    RETRY_STREAKS[kind] = 0
+
+# ----------------------------------------------------------------------------------------------
+#   Work availability: wake on a pool event instead of sleeping out the backoff.
+# ----------------------------------------------------------------------------------------------
+
+_WORK_POLL_SECONDS = 25
+_WORK_REPOLL_MIN_SECONDS = 5
+_WORK_REPOLL_MAX_SECONDS = 60
+_WORK_WAKE_SPREAD_SECONDS = 2.0
+
+class _WorkListener:
+    """
+    One long-lived thread that waits on WORK_EVENTS_URL for successive
+    _wait_for_work() calls, so at most one connection is open at a time.
+    It only listens while armed. A text/event-stream response is read as
+    server-sent events ("work" or unnamed events with data wake the worker,
+    comments are keep-alives); any other 200 is a long-poll answer meaning
+    work is available and 204 means the long-poll timed out. A 200 or 204
+    that comes back without holding the request, or a failing endpoint, is
+    re-polled with backoff instead of in a tight loop, so an endpoint that
+    always answers 200 at once wakes the worker at most once per backoff.
+    """
+
+    def __init__(self):
+        self.url = ""
+        self.armed = threading.Event()
+        self.available = threading.Event()
+        self.failed = threading.Event()
+        self.session = requests.Session()
+        self.thread = None
+
+    def arm(self, url):
+        self.url = url
+        self.available.clear()
+        self.armed.set()
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="work-listener", daemon=True)
+            self.thread.start()
+
+    def disarm(self):
+        self.armed.clear()
+
+    def _signal(self):
+        if self.armed.is_set():
+            self.available.set()
+
+    def _run(self):
+        streak = 0
+        while True:
+            self.armed.wait()
+            started = time.time()
+            held = self._listen_once() or time.time() - started >= _WORK_POLL_SECONDS / 2
+            # Idle until the caller has consumed the signal (disarm) or re-armed.
+            while self.available.is_set() and self.armed.is_set():
+                time.sleep(0.2)
+            if held:
+                streak = 0
+                continue
+            streak += 1
+            time.sleep(_jittered_backoff(streak, _WORK_REPOLL_MIN_SECONDS, _WORK_REPOLL_MAX_SECONDS))
+
+    def _listen_once(self):
+        """One request; True when a stream delivered a work event. _run() times the rest."""
+        headers = {"pool-token": POOL_TOKEN, "Accept": "text/event-stream", "User-Agent": "unitead-gpu-script/1.0"}
+        try:
+            with self.session.get(self.url, headers=headers, params={"timeout": _WORK_POLL_SECONDS},
+                                  stream=True, timeout=(5, _WORK_POLL_SECONDS + 15)) as r:
+                if r.status_code == 204:
+                    self.failed.clear()
+                    return False
+                if r.status_code != 200:
+                    self.failed.set()
+                    return False
+                self.failed.clear()
+                if "text/event-stream" not in (r.headers.get("Content-Type") or ""):
+                    self._signal()
+                    return False
+                event, data = "message", []
+                for line in r.iter_lines(decode_unicode=True):
+                    if not self.armed.is_set():
+                        return True
+                    if line:
+                        if line.startswith(":"):
+                            continue
+                        field, _, value = line.partition(":")
+                        value = value[1:] if value.startswith(" ") else value
+                        if field == "event":
+                            event = value
+                        elif field == "data":
+                            data.append(value)
+                        continue
+                    if event in ("work", "message") and (data or event == "work"):
+                        self._signal()
+                        return True
+                    event, data = "message", []
+                return False
+        except requests.RequestException:
+            self.failed.set()
+            return False
+
+WORK_LISTENER = _WorkListener()
+
+def _wait_for_work(seconds):
+    """
+    Wait up to `seconds` before fetching again. With work_events_url set the
+    wait ends as soon as the pool signals new work (after a short random
+    spread so rigs do not all fetch at once); without it, or if the events
+    endpoint fails, this is a plain interruptible sleep. Returns True when
+    woken by an event.
+    """
+    if not WORK_EVENTS_URL:
+        _interruptible_sleep(seconds)
+        return False
+    WORK_LISTENER.arm(WORK_EVENTS_URL)
+    end = time.time() + max(0, seconds)
+    warned = False
+    try:
+        while True:
+            _poll_control_flags()
+            if SHUTDOWN_REQUESTED:
+                return False
+            remaining = end - time.time()
+            if remaining <= 0:
+                return False
+            if WORK_LISTENER.available.wait(min(1.0, remaining)):
+                logger("Info", "Pool signalled new work; fetching now.")
+                _interruptible_sleep(random.uniform(0, _WORK_WAKE_SPREAD_SECONDS))
+                return True
+            if WORK_LISTENER.failed.is_set() and not warned:
+                warned = True
+                logger("Warning", f"Work events endpoint unavailable; retrying in {remaining:.0f}s.")
+    finally:
+        WORK_LISTENER.disarm()
+
 def fetch_block_data():
     """
     Fetch the work block from API and notify via Telegram on failure.
@@ -568,10 +1247,20 @@ def fetch_block_data():
     try:
         logger("Info", f"Fetching data from {API_URL}")
         params = {"length": BLOCK_LENGTH} if BLOCK_LENGTH else None
-        response = requests.get(API_URL, headers=headers, params=params, timeout=15)
+        response = _pool_request("GET", API_URL, headers=headers, params=params, timeout=15)
         
         if response.status_code == 200:
-            return response.json()
+            try:
+                data = response.json()
+            except ValueError:
+                update_status_rl({"last_error": "API returned invalid block JSON"}, "api_fetch_error", 300)
+                logger("Error", f"Invalid block JSON from API: {(response.text or '')[:120]}")
+                return None
+            if not isinstance(data, dict):
+                logger("Error", "Unexpected block payload from API.")
+                return None
+            _clear_pool_pressure()
+            return data
         elif response.status_code == 409:
             try:
                 data = response.json()
@@ -584,6 +1273,7 @@ def fetch_block_data():
                 update_status({"all_blocks_solved": True, "next_fetch_in": 0})
                 logger("Success", "All blocks solved. Shutting down.")
                 return None
+            _note_pool_pressure(response)
             error_message = (
                 f"No range available: `{msg or 'No available random range'}`"
             )
@@ -591,6 +1281,8 @@ def fetch_block_data():
             logger("Error", f"Error fetching block: 409 - {response.text}")
             return None
         else:
+            if _is_pool_pressure(response):
+                _note_pool_pressure(response)
             error_message = f"API error `{response.status_code}`"
             update_status_rl({"last_error": error_message}, "api_fetch_error", 300)
             logger("Error", f"Error fetching block: {response.status_code} - {response.text}")
@@ -604,7 +1296,24 @@ def fetch_block_data():
 
 # ----------------------------------------------------------------------------------------------
 
-def post_private_keys(private_keys):
+# Submit errors the pool answers the same way however often the batch is retried
+# (src/app/api/block/submit/route.ts), and every retry counts as a failure there.
+_REJECTED_SUBMIT_ERRORS = ("not all private keys are correct", "block already completed or expired", "block not found", "block does not belong")
+
+def _is_rejected_batch(response):
+    if response.status_code not in (400, 404):
+        return False
+    try:
+        msg = str(response.json().get("error", "")).lower()
+    except Exception:
+        msg = (response.text or "").lower()
+    return any(e in msg for e in _REJECTED_SUBMIT_ERRORS)
+
+def post_private_keys(private_keys, session=None, block_id=None):
+    """
+    Submit one block's keys (to `block_id` when given). Returns (ok, drop):
+    drop is True when the pool will never take this batch.
+    """
     headers = {
         "pool-token": POOL_TOKEN,
         "Content-Type": "application/json",
@@ -612,16 +1321,26 @@ def post_private_keys(private_keys):
         "User-Agent": "unitead-gpu-script/1.0"
     }
     data = {"privateKeys": private_keys}
+    if block_id:
+        data["blockId"] = block_id
     logger("Info", f"Posting batch of {len(private_keys)} private keys to API.")
     
     try:
         url = API_URL+"/submit"
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = _pool_request("POST", url, session=session, headers=headers, json=data, timeout=10)
         if response.status_code == 200:
+            _clear_pool_pressure()
+            _reset_retry("submit")
             logger("Success", "Private keys posted successfully.")
             update_status({"last_batch": f"Sent {len(private_keys)} keys"})
             return (True, False)
         else:
+            if _is_pool_pressure(response):
+                _note_pool_pressure(response)
+            if _is_rejected_batch(response):
+                logger("Error", f"Pool rejected the batch: {(response.text or '')[:120]}")
+                update_status_rl({"last_batch": f"Rejected status {response.status_code}"}, "post_rejected", 300)
+                return (False, True)
             txt = ""
             try:
                 txt = (response.text or "").strip()
@@ -641,7 +1360,7 @@ def post_private_keys(private_keys):
                 attempts = 1
                 while attempts < 3:
                     try:
-                        r2 = requests.post(url, headers=headers, json=data, timeout=10)
+                        r2 = _pool_request("POST", url, session=session, headers=headers, json=data, timeout=10)
                         if r2.status_code == 200:
                             logger("Success", "Private keys posted successfully.")
                             update_status({"last_batch": f"Sent {len(private_keys)} keys"})
@@ -675,16 +1394,31 @@ def post_private_keys(private_keys):
 
 # ----------------------------------------------------------------------------------------------
 
+IN_FILE_STATE = {"digest": None, "mtime_ns": None, "size": None}
+
+def _in_file_matches(digest):
+    if IN_FILE_STATE["digest"] != digest:
+        return False
+    try:
+        st = os.stat(IN_FILE)
+    except OSError:
+        return False
+    return st.st_mtime_ns == IN_FILE_STATE["mtime_ns"] and st.st_size == IN_FILE_STATE["size"]
+
 def save_addresses_to_in_file(addresses, additional_addresses):
-    all_addresses = list(addresses)
     extras = [a for a in (additional_addresses or []) if isinstance(a, str) and a.strip()]
-    for a in extras:
-        if a not in all_addresses:
-            all_addresses.append(a)
+    all_addresses = list(dict.fromkeys(list(addresses) + extras))
+    content = "\n".join(all_addresses) + "\n"
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if _in_file_matches(digest):
+        logger("Info", f"'{IN_FILE}' unchanged ({len(all_addresses)} addresses); skipped rewrite.")
+        return
 
     try:
         with open(IN_FILE, "w") as file:
-            file.write("\n".join(all_addresses) + "\n")
+            file.write(content)
+        st = os.stat(IN_FILE)
+        IN_FILE_STATE.update({"digest": digest, "mtime_ns": st.st_mtime_ns, "size": st.st_size})
         logger("Info", f"Addresses saved to '{IN_FILE}'. Total: {len(all_addresses)}")
     except Exception as e:
         logger("Error", f"Failed to save addresses to '{IN_FILE}': {e}")
@@ -728,11 +1462,264 @@ def _parse_length_to_count(s):
     except Exception:
         return None
 
-def run_external_program(start_hex, end_hex):
-    """Run external program with given keyspace and stream live feedback."""
-    keyspace = f"{start_hex}:{end_hex}"
-    
-    requested_len = _parse_length_to_count(BLOCK_LENGTH)
+# Warm engine across blocks: not implemented, launch overhead is measured instead.
+# The pool is not the blocker. It keeps one active block per token *and workerId*, so
+# several blocks can be leased at once under distinct workerIds (the CPU lane does).
+# The engines are: VanitySearch and BitCrack take a single --keyspace and read in.txt
+# once at start, with no way to hand a running process a new range or target list.
+# Queued keyspaces would still mean one process per block, which saves fetch latency
+# but none of the CUDA init. A warm mode needs an engine build that accepts ranges on
+# stdin; ENGINE_STATS below shows per engine whether that is worth doing.
+ENGINE_STATS_FILE = "engine_stats.json"
+ENGINE_STATS = {}
+
+# Progress lines of both engines carry a rate such as "[1234.56 Mk/s]" or "812.33 MKey/s".
+_RATE_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)\s*([KMGT]?)(?:keys?|k)/s", re.IGNORECASE)
+
+def _load_engine_stats():
+    global ENGINE_STATS
+    try:
+        if os.path.exists(ENGINE_STATS_FILE):
+            with open(ENGINE_STATS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    ENGINE_STATS = data
+    except Exception:
+        pass
+
+def _save_engine_stats():
+    try:
+        _atomic_write_json(ENGINE_STATS_FILE, ENGINE_STATS)
+    except Exception:
+        pass
+
+def _record_engine_launch(engine, startup_s, runtime_s):
+    """
+    Track per-engine launch overhead (spawn until the first progress line)
+    against total runtime so the cost of relaunching per block is visible.
+    """
+    st = ENGINE_STATS.get(engine) or {}
+    launches = int(st.get("launches", 0)) + 1
+    total_startup = float(st.get("total_startup_s", 0.0)) + float(startup_s)
+    total_runtime = float(st.get("total_runtime_s", 0.0)) + float(runtime_s)
+    ENGINE_STATS[engine] = {
+        "launches": launches,
+        "last_startup_s": round(float(startup_s), 3),
+        "avg_startup_s": round(total_startup / launches, 3),
+        "total_startup_s": round(total_startup, 3),
+        "total_runtime_s": round(total_runtime, 3),
+    }
+    _save_engine_stats()
+    overhead_pct = (total_startup / total_runtime * 100.0) if total_runtime > 0 else 0.0
+    STATUS["engine_startup"] = f"{engine} {startup_s:.1f}s (avg {total_startup / launches:.1f}s, {overhead_pct:.1f}% of runtime)"
+    logger("Info", f"{engine} launch overhead {startup_s:.2f}s; average {total_startup / launches:.2f}s over {launches} launch(es), {overhead_pct:.1f}% of engine time.")
+
+THROUGHPUT_HISTORY_FILE = "throughput_history.json"
+THROUGHPUT_HISTORY = {}
+THROUGHPUT_MIN_BASELINE_SAMPLES = 3
+_RATE_UNITS = {"": 1, "K": 10**3, "M": 10**6, "G": 10**9, "T": 10**12}
+
+def _parse_rate(line):
+    """Keys per second from an engine progress line (first rate on the line), or None."""
+    m = _RATE_RE.search(line)
+    if not m:
+        return None
+    try:
+        return float(m.group(1)) * _RATE_UNITS.get(m.group(2).upper(), 1)
+    except ValueError:
+        return None
+
+def _format_rate(v):
+    for unit, mult in (("T", 10**12), ("G", 10**9), ("M", 10**6), ("K", 10**3)):
+        if v >= mult:
+            return f"{v / mult:.2f} {unit}k/s"
+    return f"{v:.0f} k/s"
+
+def _sustained_rate(samples):
+    """Median of the samples after dropping the first fifth (warm-up)."""
+    if not samples:
+        return None
+    steady = sorted(samples[len(samples) // 5:] or samples)
+    return steady[len(steady) // 2]
+
+def _load_throughput_history():
+    global THROUGHPUT_HISTORY
+    try:
+        if os.path.exists(THROUGHPUT_HISTORY_FILE):
+            with open(THROUGHPUT_HISTORY_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    THROUGHPUT_HISTORY = data
+    except Exception:
+        pass
+
+def _throughput_key(engine):
+    gpu = "all" if engine == "vanity" and GPU_COUNT > 1 else str(GPU_INDEX)
+    return f"gpu{gpu}:{engine}:{BLOCK_LENGTH or 'auto'}"
+
+def _record_throughput(engine, rate):
+    """
+    Compare a block's sustained rate with the rolling median for this
+    GPU/engine/block length and raise a status alert when it falls more
+    than throughput_alert_percent below it. Regressed samples are kept out
+    of the history, so a rig that stays throttled keeps alerting instead
+    of dragging its own baseline down; delete the key from
+    THROUGHPUT_HISTORY_FILE after an intended hardware change.
+    """
+    key = _throughput_key(engine)
+    history = [float(x) for x in (THROUGHPUT_HISTORY.get(key) or [])]
+    baseline = None
+    if len(history) >= THROUGHPUT_MIN_BASELINE_SAMPLES:
+        ordered = sorted(history)
+        baseline = ordered[len(ordered) // 2]
+    drop_pct = (1.0 - rate / baseline) * 100.0 if baseline else 0.0
+    if drop_pct < THROUGHPUT_ALERT_PERCENT:
+        history.append(float(rate))
+        THROUGHPUT_HISTORY[key] = history[-THROUGHPUT_HISTORY_SIZE:]
+        try:
+            _atomic_write_json(THROUGHPUT_HISTORY_FILE, THROUGHPUT_HISTORY)
+        except Exception:
+            pass
+    if baseline is None:
+        STATUS["throughput"] = f"{_format_rate(rate)} (building baseline)"
+        logger("Info", f"Sustained rate {_format_rate(rate)} for {key}; baseline needs {THROUGHPUT_MIN_BASELINE_SAMPLES} blocks.", rate=rate)
+        return False
+    STATUS["throughput"] = f"{_format_rate(rate)} (baseline {_format_rate(baseline)})"
+    if drop_pct >= THROUGHPUT_ALERT_PERCENT:
+        msg = f"Throughput {_format_rate(rate)} is {drop_pct:.0f}% below baseline {_format_rate(baseline)} ({key})"
+        logger("Warning", msg, rate=rate, baseline=baseline)
+        update_status_rl({"last_error": msg}, "throughput_regression", 900)
+        return True
+    logger("Info", f"Sustained rate {_format_rate(rate)} vs baseline {_format_rate(baseline)} for {key}.", rate=rate, baseline=baseline)
+    return False
+
+# ----------------------------------------------------------------------------------------------
+#   Engine binaries: validated once per build, capabilities cached across runs.
+# ----------------------------------------------------------------------------------------------
+
+ENGINE_CAPS_FILE = "engine_caps.json"
+ENGINE_CAPS = {}
+_ENGINE_CAPS_LOCK = threading.Lock()
+# VanitySearch "GPU #0 NVIDIA GeForce RTX 3090 (82x128 cores)", BitCrack "Initializing NVIDIA ...".
+_DEVICE_RE = re.compile(r"(?:GPU #\d+\s+|Initializing\s+)(.+?)(?:\s+\(|$)")
+
+def _load_engine_caps():
+    global ENGINE_CAPS
+    try:
+        if os.path.exists(ENGINE_CAPS_FILE):
+            with open(ENGINE_CAPS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                ENGINE_CAPS = data
+    except Exception:
+        ENGINE_CAPS = {}
+
+def _save_engine_caps():
+    try:
+        with _ENGINE_CAPS_LOCK:
+            _atomic_write_json(ENGINE_CAPS_FILE, ENGINE_CAPS)
+    except Exception:
+        pass
+
+def _engine_summary(path):
+    caps = ENGINE_CAPS.get(path) or {}
+    parts = [p for p in (caps.get("version"), caps.get("device")) if p]
+    return " on ".join(parts)
+
+def _resolve_engine_path(path):
+    """
+    Absolute path for an engine setting, so it still resolves when the engine
+    runs with another working directory (the CPU lane runs in cpu_lane/).
+    A bare name is looked up on PATH.
+    """
+    if not path or os.path.isabs(path):
+        return path
+    if os.sep in path or (os.altsep and os.altsep in path):
+        return os.path.abspath(path)
+    return shutil.which(path) or path
+
+def _validate_engines():
+    """
+    Check each configured engine binary: it must resolve to an executable
+    file, and VanitySearch builds report their version with -v. Results are
+    cached in ENGINE_CAPS_FILE keyed on (path, mtime, size), so an unchanged
+    binary is not executed again on later starts.
+    """
+    binaries = {"vanity": APP_PATH, "bitcrack": BITCRACK_PATH if AUTO_SWITCH else "", "cpu_lane": CPU_LANE_PATH if CPU_LANE_ENABLED else ""}
+    changed = False
+    for name, path in binaries.items():
+        if not path or (name == "cpu_lane" and _resolve_engine_path(path) == _resolve_engine_path(APP_PATH)):
+            continue
+        resolved = shutil.which(path)
+        if not resolved:
+            logger("Error", f"Engine '{path}' ({name}) not found or not executable. Check settings.json.")
+            update_status_rl({"last_error": f"Engine {name} not found"}, "engine_missing", 300)
+            continue
+        st = os.stat(resolved)
+        key = [os.path.abspath(resolved), st.st_mtime_ns, st.st_size]
+        with _ENGINE_CAPS_LOCK:
+            cached = dict(ENGINE_CAPS.get(path) or {})
+        if cached.get("key") == key:
+            continue
+        version = None
+        if name != "bitcrack":
+            try:
+                out = subprocess.run([resolved, "-v"], capture_output=True, text=True, timeout=10).stdout
+                version = next((l.strip() for l in out.splitlines() if l.strip()), None)
+            except (OSError, subprocess.SubprocessError):
+                version = None
+        cached.update({"key": key, "version": version, "validated_at": int(time.time())})
+        with _ENGINE_CAPS_LOCK:
+            ENGINE_CAPS[path] = cached
+        changed = True
+        logger("Info", f"Validated {name} engine {resolved}" + (f" ({version})" if version else "") + ".")
+    if changed:
+        _save_engine_caps()
+    if APP_PATH and _engine_summary(APP_PATH):
+        STATUS["engine"] = _engine_summary(APP_PATH)
+
+def _record_engine_device(path, line):
+    """Cache the device name the engine prints while initialising."""
+    m = _DEVICE_RE.search(line)
+    if not m:
+        return False
+    device = m.group(1).strip()
+    with _ENGINE_CAPS_LOCK:
+        caps = ENGINE_CAPS.setdefault(path, {})
+        if caps.get("device") == device:
+            return True
+        caps["device"] = device
+    _save_engine_caps()
+    STATUS["engine"] = _engine_summary(path)
+    return True
+
+def _note_first_hash(ts):
+    """
+    Record time-to-first-hash (process start to first engine progress line)
+    once per run. Called from the engine output loop, so it only logs and sets
+    STATUS; the next regular status update publishes it.
+    """
+    if STATUS.get("first_hash"):
+        return
+    ttfh = ts - PROCESS_STARTED
+    STATUS["first_hash"] = f"{ttfh:.1f}s"
+    logger("Success", f"Time to first hash: {ttfh:.1f}s after start.", duration=round(ttfh, 3))
+
+def _startup_checks():
+    """Startup work that does not gate the first fetch: engine validation and coordinator registration."""
+    try:
+        _validate_engines()
+    except Exception as e:
+        logger("Error", f"Engine validation failed: {e}")
+    with requests.Session() as session:
+        _coordinator_register(session)
+
+def _select_engine(start_hex, end_hex, cfg=None):
+    """Pick "vanity", "bitcrack" or (cpu_threads set) "cpu" for a keyspace; cfg defaults to WORKER_CONFIG."""
+    cfg = cfg or WORKER_CONFIG
+    if cfg.get("cpu_threads"):
+        return "cpu"
+    requested_len = _parse_length_to_count(cfg["block_length"])
     try:
         actual_len = int(end_hex, 16) - int(start_hex, 16)
     except Exception:
@@ -740,45 +1727,72 @@ def run_external_program(start_hex, end_hex):
     compare_len = requested_len if requested_len is not None else actual_len
 
     chosen = "vanity"
-    if AUTO_SWITCH:
-        if GPU_COUNT > 1:
+    if cfg["auto_switch"]:
+        if cfg["gpu_count"] > 1:
             chosen = "vanity"
         else:
-            if compare_len is not None and compare_len < 10**12 and BITCRACK_PATH:
+            if compare_len is not None and compare_len < 10**12 and cfg["bitcrack_path"]:
                 chosen = "bitcrack"
             else:
                 chosen = "vanity"
-    if chosen == "bitcrack" and not BITCRACK_PATH:
+    if chosen == "bitcrack" and not cfg["bitcrack_path"]:
         chosen = "vanity"
+    return chosen
 
+def _build_engine_command(chosen, keyspace, cfg=None, in_file=IN_FILE, out_file=OUT_FILE):
+    cfg = cfg or WORKER_CONFIG
+    app_args, bitcrack_args = cfg["app_args"], cfg["bitcrack_args"]
+    if chosen == "cpu":
+        base = [
+            cfg["app_path"],
+            "-t", str(cfg["cpu_threads"]),
+            "-i", in_file,
+            "-o", out_file,
+        ]
+        if isinstance(app_args, str) and app_args.strip():
+            base += shlex.split(app_args)
+        return base + ["--keyspace", keyspace]
     if chosen == "vanity":
         base = [
-            APP_PATH,
+            cfg["app_path"],
             "-t", "0",
             "-gpu",
-            "-i", IN_FILE,
-            "-o", OUT_FILE,
-        ]
-        if GPU_COUNT <= 1:
-            base += ["-gpuId", GPU_INDEX]
-        if isinstance(APP_ARGS, str) and APP_ARGS.strip():
-            base += shlex.split(APP_ARGS)
-        command = base + ["--keyspace", keyspace]
-    else:
-        base = [
-            BITCRACK_PATH,
-            "-i", IN_FILE,
-            "-o", OUT_FILE,
-            "-d", GPU_INDEX,
+            "-i", in_file,
+            "-o", out_file,
         ]
-        if isinstance(BITCRACK_ARGS, str) and BITCRACK_ARGS.strip():
-            base += shlex.split(BITCRACK_ARGS)
-        command = base + ["--keyspace", keyspace]
+        if cfg["gpu_count"] <= 1:
+            base += ["-gpuId", cfg["gpu_index"]]
+        if isinstance(app_args, str) and app_args.strip():
+            base += shlex.split(app_args)
+        return base + ["--keyspace", keyspace]
+    base = [
+        cfg["bitcrack_path"],
+        "-i", in_file,
+        "-o", out_file,
+        "-d", cfg["gpu_index"],
+    ]
+    if isinstance(bitcrack_args, str) and bitcrack_args.strip():
+        base += shlex.split(bitcrack_args)
+    return base + ["--keyspace", keyspace]
+
+def run_external_program(start_hex, end_hex):
+    """Run external program with given keyspace and stream live feedback."""
+    global ENGINE_PROCESS
+    keyspace = f"{start_hex}:{end_hex}"
+    chosen = _select_engine(start_hex, end_hex)
+    LOG_CONTEXT["engine"] = chosen
+    command = _build_engine_command(chosen, keyspace)
     clean_out_file()
     
     logger("Info", f"Running with keyspace: {Fore.GREEN}{keyspace}{Style.RESET_ALL}")
 
+    watcher = None
     try:
+        launched_at = time.time()
+        first_progress_at = None
+        device_seen = False
+        rate_samples = []
+        watcher = HitWatcher(OUT_FILE).start() if ADDITIONAL_ADDRESS_SET else None
         # Use Popen to run the process and access real-time I/O streams
         with subprocess.Popen(
             command, 
@@ -787,18 +1801,40 @@ def run_external_program(start_hex, end_hex):
             text=True, 
             bufsize=1 
         ) as process:
+            ENGINE_PROCESS = process
+            if SHUTDOWN_NOW:
+                _stop_engine()
             
             # Read and display subprocess output line by line
             for line in process.stdout:
+                _poll_control_flags()
+                rate = _parse_rate(line)
+                if rate is not None:
+                    rate_samples.append(rate)
+                    if first_progress_at is None:
+                        first_progress_at = time.time()
+                        _note_first_hash(first_progress_at)
+                elif not device_seen and first_progress_at is None:
+                    device_seen = _record_engine_device(command[0], line)
                 # Real-time feedback
-                print(f"{Fore.CYAN}  > {line.strip()}{Style.RESET_ALL}", flush=True)
+                engine_output(line.strip())
 
             # Espera o processo terminar e verifica o código de retorno
             return_code = process.wait()
+            ENGINE_PROCESS = None
+            finished_at = time.time()
+            if first_progress_at is not None:
+                _record_engine_launch(chosen, first_progress_at - launched_at, finished_at - launched_at)
 
             if return_code == 0:
-                logger("Success", "External program finished successfully")
+                logger("Success", "External program finished successfully", duration=round(finished_at - launched_at, 3))
+                sustained = _sustained_rate(rate_samples)
+                if sustained:
+                    _record_throughput(chosen, sustained)
                 return True
+            elif SHUTDOWN_NOW:
+                logger("Warning", "External program stopped for shutdown; block checkpointed.")
+                return False
             else:
                 logger("Error", f"External program failed with return code: {return_code}")
                 return False
@@ -809,15 +1845,278 @@ def run_external_program(start_hex, end_hex):
     except Exception as e:
         logger("Error", f"Exception while executing: {e}")
         return False
+    finally:
+        ENGINE_PROCESS = None
+        if watcher is not None:
+            watcher.stop()
+
+# ----------------------------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------------------------
+#   Hit fast lane: additional-address hits skip the status path entirely.
+# ----------------------------------------------------------------------------------------------
+
+HANDLED_HITS = set()
+
+def _fsync_dir(path):
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
 
-def process_out_file():
+def _persist_hits(pairs, paths=None):
+    """Append hits to KEYFOUND_FILE (or `paths`) and the backup copy, fsyncing each. Returns paths written."""
+    lines = "".join(f"{addr}:{key}\n" for (addr, key) in pairs)
+    written = []
+    for path in dict.fromkeys(paths or [KEYFOUND_FILE, KEYFOUND_BACKUP_PATH]):
+        if not path:
+            continue
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(path)
+            written.append(path)
+        except Exception as e:
+            logger("KEYFOUND Error", f"Failed to save private key to '{path}': {e}")
+    return written
+
+def _send_hit_alert(pairs, saved_to, session=None):
+    """Send a new Telegram message right away, outside update_status and its rate limits."""
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        return False
+    lines = ["🚨 <b>KEY FOUND</b>"]
+    if WORKER_NAME:
+        lines.append(f"👷 <b>Worker</b>: <code>{_escape_html(WORKER_NAME)}</code>")
+    for addr, key in pairs:
+        lines.append(f"🎯 <code>{_escape_html(addr)}</code>")
+        if KEYFOUND_ALERT_INCLUDE_KEY:
+            lines.append(f"🔑 <code>{_escape_html(key)}</code>")
+    lines.append(f"💾 Saved to <code>{_escape_html(', '.join(saved_to) or 'nowhere (check disk!)')}</code>")
+    payload = {
+        "chat_id": str(TELEGRAM_CHAT_ID),
+        "text": "\n".join(lines),
+        "parse_mode": "HTML",
+        "disable_web_page_preview": True,
+    }
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    for attempt in range(3):
+        if attempt:
+            time.sleep(0.5 * attempt)
+        try:
+            r = (session or HTTP_SESSION).post(url, data=payload, timeout=5)
+            if r.status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+    return False
+
+def _submit_hits_now(pairs, session=None):
+    """
+    Post just the hit keys to the pool at once (at most 30, the route's cap).
+    They are not padded: a partial batch that is not the puzzle key counts
+    as a failed submit, and other blocks' pending keys must not go with it.
+    """
+    hit_keys = [key for (_, key) in pairs][:30]
+    return post_private_keys(hit_keys, session=session, block_id=CURRENT_BLOCK_ID)[0]
+
+def fast_lane_hits(pairs, discovered_at=None, session=None):
+    """
+    Handle additional-address hits as soon as they are seen: durable
+    persist first, then an immediate alert, then optionally a pool submit.
+    Each (address, key) pair is handled once per run. Callers off the main
+    thread pass their own requests `session`.
+    """
+    fresh = [p for p in pairs if p not in HANDLED_HITS]
+    if not fresh:
+        return []
+    HANDLED_HITS.update(fresh)
+    discovered_at = discovered_at or time.time()
+    saved_to = _persist_hits(fresh)
+    persisted_at = time.time()
+    logger("KEYFOUND", f"{len(fresh)} key(s) for additional addresses found; saved to {', '.join(saved_to) or 'NO FILE'}.")
+    alerted = _send_hit_alert(fresh, saved_to, session=session)
+    alerted_at = time.time()
+    latency = alerted_at - discovered_at
+    STATUS["keyfound_latency"] = f"{latency:.2f}s"
+    logger("KEYFOUND", f"Hit alert {'sent' if alerted else 'NOT sent'}: persisted {persisted_at - discovered_at:.3f}s, alerted {latency:.3f}s after discovery.", duration=round(latency, 3))
+    if KEYFOUND_SUBMIT_TO_POOL:
+        ok = _submit_hits_now(fresh, session=session)
+        logger("KEYFOUND", f"Immediate pool submission {'succeeded' if ok else 'failed; keys stay in ' + KEYFOUND_FILE}.")
+    return fresh
+
+class HitWatcher:
+    """
+    Poll out.txt every `interval` seconds on its own thread while the engine
+    runs and pass additional-address hits to fast_lane_hits() without
+    waiting for the block to finish. Detection does not depend on the
+    engine printing, and alerting never blocks the engine output loop.
+    Only complete records are considered; the rest waits for the next poll.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.offset = 0
+        self.fmt = None
+        self.last_size = 0
+        self.session = requests.Session()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="hit-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling; waits for an alert in progress so the end-of-block pass sees it handled."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger("Error", f"Hit watcher error: {e}")
+
+    def poll(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        if st.st_size <= self.last_size:
+            return
+        self.last_size = st.st_size
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        cut = chunk.rfind(b"\n") + 1
+        if cut <= 0:
+            return
+        chunk = chunk[:cut]
+        if self.fmt is None:
+            self.fmt = _detect_out_format(chunk[:_OUT_SNIFF_BYTES])
+        pattern = _VANITY_RECORD_RE if self.fmt == "vanity" else _BITCRACK_RECORD_RE
+        hits = []
+        last_end = 0
+        for m in pattern.finditer(chunk):
+            last_end = m.end()
+            addr = m.group(1)
+            if addr:
+                a = addr.decode("ascii", "replace")
+                if _is_additional_target(a):
+                    hits.append((a, m.group(2).decode("ascii")))
+        if self.fmt == "vanity":
+            # Keep an unfinished "Pub Addr" record for the next poll.
+            pending = chunk.rfind(b"Pub Addr: ", last_end)
+            self.offset += last_end if pending < 0 and last_end else (pending if pending >= 0 else cut)
+        else:
+            self.offset += cut
+        if hits:
+            fast_lane_hits(hits, discovered_at=st.st_mtime, session=self.session)
+
+def _is_additional_target(addr, sets=None):
+    address_set, hash160_set = sets or (ADDITIONAL_ADDRESS_SET, ADDITIONAL_HASH160_SET)
+    if addr in address_set:
+        return True
+    # Some engine builds print the hash160 instead of the encoded address.
+    if hash160_set and len(addr) == 40:
+        try:
+            return bytes.fromhex(addr) in hash160_set
+        except ValueError:
+            return False
+    return False
+
+# VanitySearch: "Pub Addr: <addr>" followed within a few lines by "Priv (HEX): 0x<hex>".
+_VANITY_RECORD_RE = re.compile(
+    rb"Pub Addr: *(\S+)[^\n]*\n(?:(?!Pub Addr: )[^\n]*\n){0,4}?Priv \(HEX\): *((?:0x)?[0-9a-fA-F]{1,64})[ \t\r]*\n"
+)
+# BitCrack: "<addr> <64-hex priv> [pubkey]" or a bare 64-hex key per line.
+_BITCRACK_RECORD_RE = re.compile(
+    rb"^[ \t]*(?:(\S+)[ \t]+)?((?:0x)?[0-9a-fA-F]{64})(?=[ \t\r\n])[^\n]*\n",
+    re.MULTILINE,
+)
+_OUT_SNIFF_BYTES = 65536
+_OUT_MMAP_THRESHOLD = 1 << 20
+
+def _detect_out_format(head):
+    return "vanity" if b"Pub Addr: " in head else "bitcrack"
+
+def _scan_out_bytes(buf, fmt):
+    out = []
+    if fmt == "vanity":
+        for m in _VANITY_RECORD_RE.finditer(buf):
+            out.append((m.group(1).decode("ascii", "replace"), m.group(2).decode("ascii")))
+    else:
+        for m in _BITCRACK_RECORD_RE.finditer(buf):
+            addr = m.group(1)
+            out.append((addr.decode("ascii", "replace") if addr else None, m.group(2).decode("ascii")))
+    return out
+
+def parse_out_file(path, engine_ok=True):
+    """
+    Parse an engine output file into (address or None, private_key) records.
+    The layout is detected once from the head of the file and matched with
+    precompiled byte patterns; large files are scanned through mmap. Every
+    record needs its closing newline, so a torn last line is only accepted
+    (as if terminated) when the engine exited cleanly.
+    """
+    import mmap
+    started = time.perf_counter()
+    size = os.path.getsize(path)
+    stats = {"bytes": size, "format": "-", "torn_tail": False, "seconds": 0.0, "mb_per_s": 0.0}
+    if size == 0:
+        return [], stats
+    with open(path, "rb") as f:
+        if size >= _OUT_MMAP_THRESHOLD:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+        try:
+            fmt = _detect_out_format(buf[:_OUT_SNIFF_BYTES])
+            records = _scan_out_bytes(buf, fmt)
+            if buf[size - 1:size] != b"\n":
+                cut = buf.rfind(b"\n") + 1
+                if engine_ok:
+                    # Re-scan the tail with the missing terminator; a VanitySearch
+                    # record may start a few lines earlier.
+                    tail_from = buf.rfind(b"Pub Addr: ", 0, cut) if fmt == "vanity" else cut
+                    tail_from = cut if tail_from < 0 else tail_from
+                    tail = _scan_out_bytes(bytes(buf[tail_from:]) + b"\n", fmt)
+                    known = set(records[-4:])
+                    records += [r for r in tail if r not in known]
+                else:
+                    stats["torn_tail"] = cut < size
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    elapsed = time.perf_counter() - started
+    stats.update({
+        "format": fmt,
+        "seconds": round(elapsed, 4),
+        "mb_per_s": (size / 1e6) / elapsed if elapsed > 0 else 0.0,
+    })
+    return records, stats
+
+def process_out_file(engine_ok=True):
     """
     Process out.txt, check additional address hit, notify via Telegram,
-    and enqueue other keys for API posting.
+    and enqueue other keys for API posting. When the engine did not exit
+    cleanly, an unterminated last line is treated as a torn write and skipped,
+    and a block with fewer keys than checkwork addresses is not queued: the
+    pool hands the same lease back and it is scanned again.
     """
-    global PENDING_KEYS
     if not os.path.exists(OUT_FILE):
         logger("Warning", f"File '{OUT_FILE}' not found for processing.")
         return False
@@ -827,60 +2126,41 @@ def process_out_file():
     
     try:
         # Read out.txt and extract keys
-        with open(OUT_FILE, "r") as file:
-            current_address = None
-            extras_set = set([a for a in (ADDITIONAL_ADDRESSES or []) if isinstance(a, str)])
-            for line in file:
-                if "Pub Addr: " in line:
-                    current_address = line.split("Pub Addr: ")[1].strip()
-                elif "Priv (HEX): " in line and current_address:
-                    private_key = line.split("Priv (HEX): ")[1].strip()
-                    if current_address in extras_set:
-                        found_pairs.append((current_address, private_key))
-                    else:
-                        keys_to_post.append(private_key)
-                    current_address = None
-                else:
-                    raw = line.strip()
-                    if raw:
-                        parts = raw.split()
-                        if len(parts) >= 2:
-                            addr = parts[0].strip()
-                            priv = parts[1].strip()
-                            if re.fullmatch(r"(?:0x)?[0-9a-fA-F]{64}", priv):
-                                if addr in extras_set:
-                                    found_pairs.append((addr, priv))
-                                else:
-                                    keys_to_post.append(priv)
-                        elif re.fullmatch(r"(?:0x)?[0-9a-fA-F]{64}", raw):
-                            keys_to_post.append(raw)
-
+        records, stats = parse_out_file(OUT_FILE, engine_ok=engine_ok)
     except Exception as e:
         logger("Error", f"Error processing file '{OUT_FILE}': {e}")
         return False
+    if stats["bytes"]:
+        logger("Info", f"Parsed {stats['bytes'] / 1e6:.2f} MB of '{OUT_FILE}' ({stats['format']}) in {stats['seconds']:.3f}s, {stats['mb_per_s']:.0f} MB/s, {len(records)} key(s).", duration=stats["seconds"])
+    if stats["torn_tail"]:
+        logger("Warning", f"Skipped incomplete last line in '{OUT_FILE}'.")
+    for addr, priv in records:
+        if addr is not None and _is_additional_target(addr):
+            found_pairs.append((addr, priv))
+        else:
+            keys_to_post.append(priv)
+    if not engine_ok and len(keys_to_post) < CURRENT_ADDR_COUNT:
+        if keys_to_post:
+            logger("Warning", f"Engine stopped with {len(keys_to_post)}/{CURRENT_ADDR_COUNT} key(s); block {CURRENT_BLOCK_ID or '-'} is rescanned when the pool hands it back.")
+        keys_to_post = []
 
     # 1. Check and Save Additional Address hit (and Notify)
     if found_pairs:
         logger("KEYFOUND", f"{len(found_pairs)} key(s) for additional addresses found. Stopping...")
         
-        # Save found private key to file
-        try:
-            with open(KEYFOUND_FILE, "w") as file:
-                file.write("\n".join([f"{addr}:{key}" for (addr, key) in found_pairs]) + "\n")
-            logger("KEYFOUND", f"Private key saved in '{KEYFOUND_FILE}'.")
-        except Exception as e:
-            logger("KEYFOUND Error", f"Failed to save private key to file: {e}")
+        # Persist and alert through the fast lane (no-op for hits already handled mid-block)
+        fast_lane_hits(found_pairs)
         if keys_to_post:
-            PENDING_KEYS.extend(keys_to_post)
+            PENDING_BATCHES.append({"block_id": CURRENT_BLOCK_ID, "keys": keys_to_post})
             _save_pending_keys()
-        update_status({"keyfound": f"{len(found_pairs)} saved to {KEYFOUND_FILE}", "pending_keys": len(PENDING_KEYS)})
+        update_status({"keyfound": f"{len(found_pairs)} saved to {KEYFOUND_FILE}", "pending_keys": _pending_key_count()})
         return True
     
     if keys_to_post:
-        PENDING_KEYS.extend(keys_to_post)
-        logger("Info", f"Accumulated {len(PENDING_KEYS)} keys for posting.")
+        PENDING_BATCHES.append({"block_id": CURRENT_BLOCK_ID, "keys": keys_to_post})
+        logger("Info", f"Accumulated {_pending_key_count()} keys for posting.")
         _save_pending_keys()
-        update_status({"pending_keys": len(PENDING_KEYS)})
+        update_status({"pending_keys": _pending_key_count()})
 
     # 3. Clear out.txt for the next cycle
     try:
@@ -925,32 +2205,662 @@ def _generate_filler_keys(count, start_hex, end_hex, exclude=None):
     except Exception:
         return []
 
+# ==============================================================================================
+#                                    EMBEDDABLE WORKER
+# ==============================================================================================
+#
+# PoolWorker runs the lease -> scan -> parse -> submit cycle with all of its state on the
+# instance, so orchestration and benchmarking code can import this module and drive many
+# workers in one process. The CLI loop under __main__ keeps using the module-level state;
+# both parse settings with _worker_config() and build engine commands with
+# _select_engine() / _build_engine_command(), so they cannot drift apart.
+#
+#     worker = PoolWorker(settings, workdir="gpu1", http=session, engine=runner, clock=clock)
+#     worker.on("submitted", lambda w, keys, ok: ...)
+#     worker.run(max_blocks=10)
+
+class SystemClock:
+    """Default clock: wall time and a blocking sleep."""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class SubprocessEngine:
+    """
+    Default engine runner: launch the command in `cwd`, hand each output line
+    to `on_line` and return the exit code. `stop()` terminates a running scan.
+    With `nice` set (POSIX only) the engine is reniced by that much right
+    after it starts; preexec_fn is not safe in a threaded process.
+    """
+
+    def __init__(self, nice=None):
+        self.process = None
+        self.nice = nice
+
+    def _renice(self, pid):
+        if not self.nice or not hasattr(os, "setpriority"):
+            return
+        try:
+            level = min(19, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+            os.setpriority(os.PRIO_PROCESS, pid, level)
+        except OSError as e:
+            logger("Error", f"Failed to renice engine {pid}: {e}")
+
+    def run(self, command, cwd, on_line):
+        with subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        ) as process:
+            self.process = process
+            self._renice(process.pid)
+            try:
+                for line in process.stdout:
+                    on_line(line.rstrip("\r\n"))
+                return process.wait()
+            finally:
+                self.process = None
+
+    def stop(self):
+        process = self.process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+
+class PoolWorker:
+    """
+    One pool worker with its own settings, files and pending keys.
+
+    `settings` uses the settings.json keys and is parsed by _worker_config()
+    into `config`. Components are injectable:
+      http   - object with request(method, url, **kwargs) returning a
+               requests-style response (default: a requests.Session)
+      engine - object with run(command, cwd, on_line) -> exit code and stop()
+               (default: SubprocessEngine)
+      clock  - object with time() and sleep(seconds) (default: SystemClock)
+
+    `worker_id` leases a separate block for this worker (the pool keeps one
+    active block per token and workerId) and `cpu_threads` runs VanitySearch
+    on that many CPU threads instead of the GPU.
+
+    Hooks registered with on(event, callback) are called as
+    callback(worker, ...):
+      block_leased(block)                  after a block was leased
+      engine_progress(line, rate)          per engine output line; rate in keys/s or None
+      keys_parsed(keys, hits)              after out.txt was parsed
+      submitted(keys, ok)                  after each submit attempt
+    A failing hook is logged and never stops the worker.
+    """
+
+    HOOKS = ("block_leased", "engine_progress", "keys_parsed", "submitted")
+
+    def __init__(self, settings, workdir=".", http=None, engine=None, clock=None, worker_id=None, cpu_threads=None):
+        self.config = _worker_config(dict(settings or {}))
+        self.config["cpu_threads"] = cpu_threads or 0
+        self.name = self.config["worker_name"] or "default"
+        self.worker_id = worker_id
+        self.targets = _target_sets(self.config["additional_addresses"])
+
+        self.workdir = os.path.abspath(workdir)
+        os.makedirs(self.workdir, exist_ok=True)
+        self.in_file = os.path.join(self.workdir, IN_FILE)
+        self.out_file = os.path.join(self.workdir, OUT_FILE)
+        self.keyfound_file = os.path.join(self.workdir, KEYFOUND_FILE)
+        self.keyfound_paths = [self.keyfound_file, self.config["keyfound_backup_path"]]
+        self.saved_to = []
+        self.pending_file = os.path.join(self.workdir, PENDING_KEYS_FILE)
+
+        self.http = http if http is not None else requests.Session()
+        self.engine = engine if engine is not None else SubprocessEngine()
+        self.clock = clock if clock is not None else SystemClock()
+        self.hooks = {event: [] for event in self.HOOKS}
+
+        self.pending = []
+        self.block = None
+        self.addr_count = 10
+        self.retry_after = 0
+        self.retry_streak = 0
+        self.all_blocks_solved = False
+        self.found = []
+        self.blocks_done = 0
+        self.stopped = False
+        self.status = {"worker": self.name, "range": "", "pending_keys": 0, "last_batch": "-", "last_error": "-"}
+        self._load_pending()
+
+    # -- hooks -------------------------------------------------------------------------------
+
+    def on(self, event, callback):
+        if event not in self.hooks:
+            raise ValueError(f"Unknown worker event '{event}'")
+        self.hooks[event].append(callback)
+        return callback
+
+    def _emit(self, event, *args):
+        for callback in self.hooks[event]:
+            try:
+                callback(self, *args)
+            except Exception as e:
+                logger("Error", f"Worker hook '{event}' failed: {e}", worker=self.name)
+
+    # -- state -------------------------------------------------------------------------------
+
+    def _load_pending(self):
+        self.pending = _read_pending_batches(self.pending_file)
+        self.status["pending_keys"] = self.pending_key_count()
+
+    def _save_pending(self):
+        try:
+            _atomic_write_json(self.pending_file, self.pending)
+        except Exception as e:
+            logger("Error", f"Failed to save '{self.pending_file}': {e}", worker=self.name)
+        self.status["pending_keys"] = self.pending_key_count()
+
+    def pending_key_count(self):
+        return sum(len(e["keys"]) for e in self.pending)
+
+    def _note_pressure(self, response=None):
+        self.retry_after = (_parse_retry_after(response) if response is not None else None) or 0
+
+    def _clear_pressure(self):
+        self.retry_after = 0
+
+    def retry_delay(self):
+        """Seconds to wait after a failed lease or scan, jittered like _retry_delay()."""
+        self.retry_streak += 1
+        delay = _jittered_backoff(self.retry_streak, self.config["backoff_base"], self.config["backoff_max"])
+        return round(max(delay, self.retry_after), 1)
+
+    def stop(self):
+        """Ask the worker to stop after the current step and terminate a running scan."""
+        self.stopped = True
+        self.engine.stop()
+
+    # -- pool --------------------------------------------------------------------------------
+
+    def _headers(self):
+        return {"pool-token": self.config["pool_token"], "ngrok-skip-browser-warning": "true", "User-Agent": "unitead-gpu-script/1.0"}
+
+    def lease(self):
+        """Fetch the next block. Returns the block dict or None."""
+        block_length = self.config["block_length"]
+        params = {"length": block_length} if block_length else {}
+        if self.worker_id:
+            params["workerId"] = self.worker_id
+        try:
+            response = self.http.request("GET", self.config["api_url"], headers=self._headers(), params=params, timeout=15)
+        except requests.RequestException as e:
+            self.status["last_error"] = f"API connection error `{type(e).__name__}`"
+            logger("Error", f"Request error {type(e).__name__}: {e}", worker=self.name)
+            return None
+        if response.status_code != 200:
+            try:
+                msg = str(response.json().get("error", "")).strip()
+            except Exception:
+                msg = (response.text or "").strip()
+            if response.status_code == 409 and msg.lower() == "all blocks are solved":
+                self.all_blocks_solved = True
+                logger("Success", "All blocks solved.", worker=self.name)
+                return None
+            if response.status_code == 409 or _is_pool_pressure(response):
+                self._note_pressure(response)
+            self.status["last_error"] = f"API error `{response.status_code}`"
+            logger("Error", f"Error fetching block: {response.status_code} - {msg}", worker=self.name)
+            return None
+        try:
+            block = response.json()
+        except ValueError:
+            block = None
+        range_data = block.get("range") if isinstance(block, dict) else None
+        addresses = block.get("checkwork_addresses") if isinstance(block, dict) else None
+        if not isinstance(range_data, dict) or not addresses:
+            self.status["last_error"] = "API returned invalid block JSON"
+            logger("Error", "Invalid block payload from API.", worker=self.name)
+            return None
+        start_hex = str(range_data.get("start", "")).replace("0x", "")
+        end_hex = str(range_data.get("end", "")).replace("0x", "")
+        if not (start_hex and end_hex):
+            logger("Error", "Key range (start/end) missing.", worker=self.name)
+            return None
+        self._clear_pressure()
+        self.block = {"id": block.get("id"), "start": start_hex, "end": end_hex, "addresses": list(addresses)}
+        self.addr_count = int(len(addresses) or 10)
+        self.status["range"] = f"{start_hex}:{end_hex}"
+        self._emit("block_leased", self.block)
+        return self.block
+
+    def submit(self, keys, block_id=None):
+        """
+        Post one batch of private keys to `block_id` (default: the leased
+        block). Returns (ok, drop) like post_private_keys.
+        """
+        url = self.config["api_url"] + "/submit"
+        headers = dict(self._headers(), **{"Content-Type": "application/json"})
+        body = {"privateKeys": keys}
+        if self.worker_id:
+            body["workerId"] = self.worker_id
+        if block_id is None and self.block:
+            block_id = self.block.get("id")
+        if block_id is not None:
+            body["blockId"] = block_id
+        ok, incompatible = False, False
+        for _ in range(3):
+            try:
+                response = self.http.request("POST", url, headers=headers, json=body, timeout=10)
+            except requests.RequestException as e:
+                self.status["last_batch"] = f"Connection error {type(e).__name__}"
+                break
+            if response.status_code == 200:
+                self._clear_pressure()
+                ok = True
+                self.status["last_batch"] = f"Sent {len(keys)} keys"
+                break
+            if _is_pool_pressure(response):
+                self._note_pressure(response)
+            if _is_rejected_batch(response):
+                self.status["last_batch"] = f"Rejected status {response.status_code}"
+                incompatible = True
+                break
+            text = (response.text or "").lower()
+            incompatible = ("incompatible privatekeys" in text) or ("incompatible private keys" in text)
+            self.status["last_batch"] = f"Failed status {response.status_code}"
+            if not incompatible:
+                break
+        self._emit("submitted", keys, ok)
+        return (ok, incompatible and not ok)
+
+    def flush(self):
+        """Submit pending batches oldest first, each to its own block; drop the ones the pool rejects."""
+        while self.pending and not self.stopped:
+            entry = self.pending[0]
+            ok, rejected = self.submit(entry["keys"], block_id=entry.get("block_id"))
+            if not (ok or rejected):
+                self._save_pending()
+                return False
+            if rejected:
+                logger("Warning", f"Dropping {len(entry['keys'])} key(s) for block {entry.get('block_id') or '-'} the pool will not accept.", worker=self.name)
+            self.pending = self.pending[1:]
+            self._save_pending()
+        return not self.pending
+
+    # -- engine ------------------------------------------------------------------------------
+
+    def command(self, start_hex, end_hex):
+        """Build the engine command line for a keyspace with the CLI builders."""
+        chosen = _select_engine(start_hex, end_hex, self.config)
+        return _build_engine_command(chosen, f"{start_hex}:{end_hex}", self.config, self.in_file, self.out_file)
+
+    def scan(self, block):
+        """Write in.txt and run the engine over the block. Returns True on a clean exit."""
+        with open(self.in_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(dict.fromkeys(list(block["addresses"]) + sorted(self.targets[0]))) + "\n")
+        with open(self.out_file, "w"):
+            pass
+
+        def on_line(line):
+            self._emit("engine_progress", line, _parse_rate(line))
+
+        try:
+            code = self.engine.run(self.command(block["start"], block["end"]), self.workdir, on_line)
+        except FileNotFoundError:
+            logger("Error", "External program not found. Check path and permissions.", worker=self.name)
+            return False
+        except Exception as e:
+            logger("Error", f"Exception while executing: {e}", worker=self.name)
+            return False
+        if code != 0:
+            logger("Error", f"External program failed with return code: {code}", worker=self.name)
+        return code == 0
+
+    def parse(self, engine_ok=True):
+        """
+        Parse out.txt into pool keys and target hits; queue keys, persist hits.
+        Like process_out_file(), an incomplete block from a failed scan is not
+        queued: the next lease hands it back and it is scanned again.
+        """
+        if not os.path.exists(self.out_file):
+            return [], []
+        records, _ = parse_out_file(self.out_file, engine_ok=engine_ok)
+        keys, hits = [], []
+        for addr, priv in records:
+            if addr is not None and _is_additional_target(addr, self.targets):
+                hits.append((addr, priv))
+            else:
+                keys.append(priv)
+        if hits:
+            saved_to = self.saved_to = _persist_hits(hits, self.keyfound_paths)
+            self.found.extend(hits)
+            logger("KEYFOUND", f"{len(hits)} key(s) for additional addresses saved to {', '.join(saved_to) or 'NO FILE'}.", worker=self.name)
+        if not engine_ok and len(keys) < self.addr_count:
+            keys = []
+        if keys:
+            self.pending.append({"block_id": self.block.get("id") if self.block else None, "keys": keys})
+            self._save_pending()
+        self._emit("keys_parsed", keys, hits)
+        return keys, hits
+
+    # -- loop --------------------------------------------------------------------------------
+
+    def run_once(self):
+        """
+        Run one lease/scan/parse/submit cycle. Returns True when a block was
+        scanned cleanly, False when no block could be leased or the engine
+        failed; run() backs off after either.
+        """
+        self.flush()
+        if self.stopped:
+            return False
+        block = self.lease()
+        if block is None or self.stopped:
+            return False
+        ran_ok = self.scan(block)
+        self.parse(engine_ok=ran_ok)
+        if ran_ok:
+            self.blocks_done += 1
+            self.retry_streak = 0
+        self.flush()
+        return ran_ok
+
+    def run(self, max_blocks=None):
+        """Loop until stopped, a target key is found, the pool is exhausted or max_blocks are done."""
+        while not self.stopped and not self.found and not self.all_blocks_solved:
+            if max_blocks is not None and self.blocks_done >= max_blocks:
+                break
+            if not self.run_once():
+                if self.all_blocks_solved or self.stopped:
+                    break
+                self.clock.sleep(self.retry_delay())
+            elif self.config["one_shot"]:
+                break
+        self.flush()
+        return self.blocks_done
+
+# ----------------------------------------------------------------------------------------------
+#   CPU lane: spare cores scan their own small leases beside the GPU engine.
+# ----------------------------------------------------------------------------------------------
+
+CPU_LANE_DIR = "cpu_lane"
+CPU_LANE_MIN_KEYS = 10**8
+
+class _LanePoolClient:
+    """PoolWorker HTTP component that goes through _pool_request on its own session."""
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def request(self, method, url, **kwargs):
+        return _pool_request(method, url, session=self.session, **kwargs)
+
+class CpuLane:
+    """
+    Optional second lane (cpu_lane_enabled): a PoolWorker in a background
+    thread with its own lease (workerId "<worker>-cpu"), in/out files under
+    cpu_lane/ and a niced CPU-only VanitySearch. Submissions share the pool
+    client and coordinator budget with the GPU loop. Target hits, already
+    saved by parse(), are alerted right away and, with keyfound_submit_to_pool,
+    submitted on the lane's own block. After each block the lease size is set
+    from the measured CPU rate so a block takes about cpu_lane_block_seconds.
+    All of the lane's HTTP (pool, coordinator relay, hit alerts) goes over
+    its own session.
+    """
+
+    def __init__(self, settings):
+        self.client = _LanePoolClient()
+        self.threads = CPU_LANE_THREADS or max(1, (os.cpu_count() or 2) - max(1, GPU_COUNT) - 1)
+        name = f"{WORKER_NAME or 'default'}-cpu"
+        lane_settings = dict(
+            settings,
+            worker_name=name,
+            vanitysearch_path=_resolve_engine_path(CPU_LANE_PATH),
+            vanitysearch_arguments="",
+            block_length=CPU_LANE_BLOCK_LENGTH,
+            auto_switch=False,
+            oneshot=False,
+        )
+        self.worker = PoolWorker(
+            lane_settings,
+            workdir=CPU_LANE_DIR,
+            http=self.client,
+            engine=SubprocessEngine(nice=CPU_LANE_NICE),
+            worker_id=name,
+            cpu_threads=self.threads,
+        )
+        self.samples = []
+        self.thread = None
+        self.worker.on("block_leased", self._on_block)
+        self.worker.on("engine_progress", self._on_progress)
+        self.worker.on("keys_parsed", self._on_parsed)
+
+    def _on_block(self, worker, block):
+        self.samples = []
+        STATUS["cpu_lane"] = f"{self.threads} threads, block {block['start']}:{block['end']}"
+
+    def _on_progress(self, worker, line, rate):
+        if rate is not None:
+            self.samples.append(rate)
+
+    def _on_parsed(self, worker, keys, hits):
+        fresh = [p for p in hits if p not in HANDLED_HITS]
+        if fresh:
+            HANDLED_HITS.update(fresh)
+            alerted = _send_hit_alert(fresh, worker.saved_to, session=self.client.session)
+            logger("KEYFOUND", f"CPU lane hit alert {'sent' if alerted else 'NOT sent'}.", lane="cpu")
+            if KEYFOUND_SUBMIT_TO_POOL:
+                ok, _ = worker.submit([key for (_, key) in fresh][:30])
+                logger("KEYFOUND", f"CPU lane pool submission {'succeeded' if ok else 'failed; keys stay in ' + worker.keyfound_file}.", lane="cpu")
+        rate = _sustained_rate(self.samples)
+        if not rate:
+            return
+        worker.config["block_length"] = str(max(CPU_LANE_MIN_KEYS, int(rate * CPU_LANE_BLOCK_SECONDS)))
+        STATUS["cpu_lane"] = f"{self.threads} threads, {_format_rate(rate)}, next block {worker.config['block_length']} keys"
+        logger("Info", f"CPU lane: {len(keys)} key(s) at {_format_rate(rate)}; next lease {worker.config['block_length']} keys.", lane="cpu")
+
+    def _run(self):
+        try:
+            self.worker.run()
+        except Exception as e:
+            logger("Error", f"CPU lane stopped: {e}", lane="cpu")
+        if self.worker.found:
+            logger("KEYFOUND", "CPU lane found a target key and stopped.", lane="cpu")
+
+    def start(self):
+        logger("Info", f"Starting CPU lane with {self.threads} thread(s) at nice {CPU_LANE_NICE}.", lane="cpu")
+        self.thread = threading.Thread(target=self._run, name="cpu-lane", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self.worker.stop()
+        if timeout is not None and self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+# ==============================================================================================
+#                                    PROFILING
+# ==============================================================================================
+
+class CycleProfiler:
+    """
+    --profile: cProfile + tracemalloc around each main-loop cycle. Writes
+    cycle_NNNN.txt (top functions, memory growth since the previous cycle)
+    and keeps summary.txt with the growth between cycle 1 and the latest.
+    """
+
+    def __init__(self, out_dir, frames=1, top=25):
+        import cProfile
+        import tracemalloc
+        self._cprofile = cProfile
+        self._tracemalloc = tracemalloc
+        self.out_dir = out_dir
+        self.top = top
+        self.cycle = 0
+        self.profile = None
+        self.started = 0.0
+        self.first_snapshot = None
+        self.prev_snapshot = None
+        self.series = []
+        os.makedirs(out_dir, exist_ok=True)
+        tracemalloc.start(max(1, int(frames)))
+
+    def _snapshot(self):
+        snap = self._tracemalloc.take_snapshot()
+        # Leave out the profiler's own bookkeeping so only worker growth shows up.
+        return snap.filter_traces((
+            self._tracemalloc.Filter(False, self._tracemalloc.__file__),
+            self._tracemalloc.Filter(False, "*cProfile.py"),
+            self._tracemalloc.Filter(False, "*pstats.py"),
+            self._tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            self._tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def begin_cycle(self):
+        self.end_cycle()
+        self.cycle += 1
+        self.started = time.time()
+        self.profile = self._cprofile.Profile()
+        self.profile.enable()
+
+    def _counters(self):
+        try:
+            tg_size = os.path.getsize(TELEGRAM_STATE_FILE) if os.path.exists(TELEGRAM_STATE_FILE) else 0
+        except OSError:
+            tg_size = 0
+        current, peak = self._tracemalloc.get_traced_memory()
+        return {
+            "pending_keys": _pending_key_count(),
+            "pending_keys_bytes": sum(len(k) for e in PENDING_BATCHES for k in e["keys"] if isinstance(k, str)),
+            "telegram_state_bytes": tg_size,
+            "rate_limit_categories": len(LAST_TELEGRAM_TS),
+            "traced_current_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+        }
+
+    def _growth_lines(self, new, old, limit):
+        stats = new.compare_to(old, "lineno")
+        return [str(st) for st in stats[:limit] if st.size_diff > 0]
+
+    def end_cycle(self):
+        if self.profile is None:
+            return
+        import io
+        import pstats
+        self.profile.disable()
+        wall = time.time() - self.started
+        snap = self._snapshot()
+        counters = self._counters()
+        self.series.append(dict(counters, cycle=self.cycle, wall_s=round(wall, 3)))
+
+        buf = io.StringIO()
+        buf.write(f"cycle {self.cycle}  wall {wall:.2f}s\n")
+        buf.write(json.dumps(counters) + "\n\n")
+        ps = pstats.Stats(self.profile, stream=buf)
+        buf.write("== top by cumulative time ==\n")
+        ps.sort_stats("cumulative").print_stats(self.top)
+        buf.write("== top by own time ==\n")
+        ps.sort_stats("tottime").print_stats(max(10, self.top // 2))
+        if self.prev_snapshot is not None:
+            buf.write("== memory growth since previous cycle ==\n")
+            buf.write("\n".join(self._growth_lines(snap, self.prev_snapshot, 15)) + "\n")
+        with open(os.path.join(self.out_dir, f"cycle_{self.cycle:04d}.txt"), "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+
+        if self.first_snapshot is None:
+            self.first_snapshot = snap
+        else:
+            self._write_summary(snap)
+        self.prev_snapshot = snap
+        self.profile = None
+        logger("Info", f"Profile for cycle {self.cycle} written to '{self.out_dir}' ({counters['traced_current_kb']} KB traced).", duration=round(wall, 3))
+
+    def _write_summary(self, snap):
+        lines = [f"memory growth cycle 1 -> cycle {self.cycle}", ""]
+        lines += self._growth_lines(snap, self.first_snapshot, 20)
+        lines += ["", "per-cycle counters:"]
+        lines += [json.dumps(row) for row in self.series]
+        with open(os.path.join(self.out_dir, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def finish(self):
+        self.end_cycle()
+        self._tracemalloc.stop()
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="United puzzle pool GPU worker")
+    parser.add_argument("--profile", action="store_true", help="profile every main-loop cycle (cProfile + tracemalloc)")
+    parser.add_argument("--profile-dir", default="profiles", help="directory for per-cycle profile reports")
+    parser.add_argument("--profile-frames", type=int, default=1, help="tracemalloc frames kept per allocation")
+    parser.add_argument("--bench-parser", metavar="FILE", help="parse an engine output file, report MB/s and exit")
+    return parser.parse_args(argv)
+
 # ==============================================================================================
 #                                    MAIN LOOP
 # ==============================================================================================
 
+def bench_parser(path, rounds=3):
+    best = None
+    for _ in range(max(1, rounds)):
+        records, stats = parse_out_file(path)
+        if best is None or stats["seconds"] < best["seconds"]:
+            best = stats
+    print(f"{path}: {best['bytes'] / 1e6:.2f} MB, format {best['format']}, {len(records)} records, "
+          f"best of {rounds}: {best['seconds']:.3f}s ({best['mb_per_s']:.0f} MB/s)")
+
 if __name__ == "__main__":
+    ARGS = _parse_args()
+    if ARGS.bench_parser:
+        bench_parser(ARGS.bench_parser)
+        sys.exit(0)
+    PROFILER = CycleProfiler(ARGS.profile_dir, ARGS.profile_frames) if ARGS.profile else None
+    _install_signal_handlers()
+    # Settings were applied at import; refresh_settings() at the top of the loop only
+    # re-parses them if settings.json changed since.
     clean_io_files()
-    refresh_settings()
     _load_pending_keys()
+    _load_engine_stats()
+    _load_throughput_history()
+    _load_engine_caps()
+    if APP_PATH and _engine_summary(APP_PATH):
+        STATUS["engine"] = _engine_summary(APP_PATH)
+    threading.Thread(target=_startup_checks, name="startup-checks", daemon=True).start()
+    if PENDING_BATCHES:
+        _start_startup_flush()
+    if CPU_LANE_ENABLED:
+        CPU_LANE = CpuLane(_load_settings()).start()
     STATUS["session_id"] = uuid.uuid4().hex[:8]
     STATUS["session_started_ts"] = time.time()
     STATUS["session_blocks"] = 0
     STATUS["session_consecutive"] = 0
     while True:
+        if PROFILER:
+            PROFILER.begin_cycle()
         refresh_settings()
-        flush_pending_keys_blocking()
+        if STARTUP_FLUSH is not None and not STARTUP_FLUSH.is_alive():
+            _join_startup_flush()
+        if STARTUP_FLUSH is None:
+            flush_pending_keys_blocking()
+        _poll_control_flags()
+        if SHUTDOWN_REQUESTED:
+            break
         if ONE_SHOT and PROCESSED_ONE_BLOCK:
             logger("Info", "One-shot mode enabled. Exiting after first block.")
             break
         # 1. Fetch block data
+        LOG_CONTEXT["phase"] = "fetch"
         block_data = fetch_block_data()
         
         if ALL_BLOCKS_SOLVED:
             break
         if not block_data:
-            logger("Error", "Could not fetch block data. Retrying in 30 seconds.")
-            time.sleep(30)
+            retry_in = _retry_delay("fetch")
+            logger("Error", f"Could not fetch block data. Retrying in {retry_in} seconds.")
+            _wait_for_work(retry_in)
             continue
 
         addresses = block_data.get("checkwork_addresses", [])
@@ -958,15 +2868,26 @@ if __name__ == "__main__":
         start_hex = range_data.get("start", "").replace("0x", "")
         end_hex = range_data.get("end", "").replace("0x", "")
         current_keyspace = f"{start_hex}:{end_hex}" # (NEW)
+        LOG_CONTEXT["block_id"] = block_data.get("id")
+        LOG_CONTEXT["range"] = current_keyspace
 
         if not addresses:
-            logger("Warning", "No addresses found in block. Retrying in 30 seconds.")
-            time.sleep(30)
+            retry_in = _retry_delay("fetch")
+            logger("Warning", f"No addresses found in block. Retrying in {retry_in} seconds.")
+            _wait_for_work(retry_in)
             continue
 
         if not (start_hex and end_hex):
-            logger("Error", "Key range (start/end) missing. Retrying in 30 seconds.")
-            time.sleep(30)
+            retry_in = _retry_delay("fetch")
+            logger("Error", f"Key range (start/end) missing. Retrying in {retry_in} seconds.")
+            _wait_for_work(retry_in)
+            continue
+        _reset_retry("fetch")
+
+        if _is_flushing_block(block_data.get("id")):
+            # Still the previous run's block: let the flush complete it, then lease a fresh one.
+            logger("Info", "Pool returned the block being flushed; waiting for the flush before fetching again.")
+            _join_startup_flush()
             continue
         
         # 2. New: New block notification logic
@@ -977,6 +2898,7 @@ if __name__ == "__main__":
 
         # Track current dynamic requirements
         try:
+            CURRENT_BLOCK_ID = block_data.get("id")
             CURRENT_ADDR_COUNT = int(len(addresses) or 10)
             CURRENT_RANGE_START = start_hex
             CURRENT_RANGE_END = end_hex
@@ -985,12 +2907,21 @@ if __name__ == "__main__":
 
         # 3. Save addresses to in.txt
         save_addresses_to_in_file(addresses, ADDITIONAL_ADDRESSES)
-        
+
+        # A signal during the fetch or status update must not start a whole new block.
+        _poll_control_flags()
+        if SHUTDOWN_REQUESTED:
+            logger("Info", "Shutdown requested before the engine started; the leased block resumes on the next run.")
+            break
+
         # 4. Run external program (no chunking)
+        LOG_CONTEXT["phase"] = "scan"
         ran_ok = run_external_program(start_hex, end_hex)
 
         # 5. Process output file (out.txt)
-        solution_found = process_out_file()
+        _join_startup_flush()
+        LOG_CONTEXT["phase"] = "parse"
+        solution_found = process_out_file(engine_ok=ran_ok)
 
         if ran_ok:
             STATUS["session_blocks"] = int(STATUS.get("session_blocks", 0)) + 1
@@ -1003,11 +2934,24 @@ if __name__ == "__main__":
         if solution_found:
             logger("Success", "ADDITIONAL ADDRESS KEY FOUND. Exiting script.")
             break
+        if SHUTDOWN_REQUESTED:
+            break
 
+        LOG_CONTEXT["phase"] = "submit"
         flush_pending_keys_blocking()
         if ONE_SHOT:
             logger("Info", "One-shot mode enabled. Exiting after first block.")
             break
-        update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": POST_BLOCK_DELAY_SECONDS})
-        logger("Info", f"No critical solution this round. Waiting {POST_BLOCK_DELAY_SECONDS} seconds for next fetch.")
-        time.sleep(POST_BLOCK_DELAY_SECONDS)
+        LOG_CONTEXT["phase"] = "idle"
+        next_delay = _post_block_delay()
+        update_status({"pending_keys": _pending_key_count(), "next_fetch_in": next_delay})
+        if next_delay > 0:
+            logger("Info", f"No critical solution this round. Waiting {next_delay} seconds for next fetch.")
+            _interruptible_sleep(next_delay)
+    if PROFILER:
+        PROFILER.finish()
+    if CPU_LANE is not None:
+        CPU_LANE.stop(timeout=30)
+    _join_startup_flush()
+    if SHUTDOWN_REQUESTED:
+        graceful_shutdown()
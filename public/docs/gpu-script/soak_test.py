@@ -0,0 +1,548 @@
+# -*- coding: utf-8 -*-
+"""
+Fault-injection soak suite for script.py — run with:
+    python -m unittest soak_test -v
+
+Runs the real worker loop in a subprocess against a local pool stand-in and
+a fake engine, injecting:
+  1. Pool faults on fetch: 5xx, 503 + Retry-After, timeouts, 409 "no range",
+     truncated JSON
+  2. Pool faults on submit: 5xx, timeouts, transient "incompatible privatekeys",
+     truncated JSON
+  3. Engine faults: crash mid-block, torn (partial) out.txt writes
+
+and checks that:
+  - every key the engine reported is accepted by the pool or left in
+    pending_keys.json after shutdown (never lost),
+  - no engine key is accepted twice (never double-posted),
+  - no batch is one the pool rejects (it validates each against the block's
+    checkwork keys), and after an engine crash the block is rescanned,
+    completed and new blocks follow,
+  - the gap from each fault until the engine is scanning again stays within
+    SOAK_RECOVERY_BUDGET seconds (default 60). Latencies are printed per fault.
+
+CheckpointTest stops the worker with SIGINT mid-block and checks that the
+restarted worker rescans that block, completes it and moves on.
+
+WorkAvailabilityTest starts with an empty pool that refills after a few
+seconds and checks that a worker waiting on work_events_url (server-sent
+events and long-poll) resumes well before its fetch backoff would expire.
+
+Needs `requests` and `colorama` (the worker's own dependencies) and a POSIX
+shell for the fake engine. Takes a few minutes.
+"""
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RECOVERY_BUDGET = float(os.environ.get("SOAK_RECOVERY_BUDGET", 60))
+FETCH_CLIENT_TIMEOUT = 15
+SUBMIT_CLIENT_TIMEOUT = 10
+BLOCK_SPAN = 1 << 40
+KEYS_PER_BLOCK = 10
+
+FETCH_FAULTS = ["ok", "500", "ok", "503", "ok", "no_range", "no_range", "ok", "truncated", "ok", "timeout", "ok"]
+SUBMIT_FAULTS = ["ok", "incompatible", "ok", "500", "ok", "truncated", "ok", "timeout", "ok"]
+ENGINE_FAULTS = ["ok", "crash", "ok", "partial", "ok", "ok"]
+
+# ---------------------------------------------------------------------------
+# Fake engine: prints progress, writes BitCrack-style "addr priv" lines and
+# logs what it emitted so the test can account for every key.
+# ---------------------------------------------------------------------------
+
+FAKE_ENGINE = r'''#!{python}
+import json, os, signal, sys, time
+args = sys.argv[1:]
+out = args[args.index("-o") + 1]
+start_hex, end_hex = args[args.index("--keyspace") + 1].split(":")
+state_path = os.path.join(os.getcwd(), "engine_state.json")
+faults = {faults}
+try:
+    launch = json.load(open(state_path))["launch"]
+except Exception:
+    launch = 0
+json.dump({{"launch": launch + 1}}, open(state_path, "w"))
+mode = faults[launch] if launch < len(faults) else "ok"
+started = time.time()
+start = int(start_hex, 16)
+keys = ["%064x" % (start + i) for i in range({per_block})]
+
+def log_event(mode, emitted):
+    with open(os.path.join(os.getcwd(), "engine_events.jsonl"), "a") as f:
+        f.write(json.dumps({{"launch": launch, "mode": mode, "start": started, "end": time.time(), "keys": emitted}}) + "\n")
+
+def stopped(signum, frame):
+    # Terminated mid-scan (checkpoint): only part of the block reached out.txt.
+    with open(out, "w") as f:
+        f.write("".join("1Soak%d %s\n" % (i, k) for i, k in enumerate(keys[:3])))
+    log_event("stopped", keys[:3])
+    sys.exit(143)
+
+signal.signal(signal.SIGTERM, stopped)
+for i in range(5):
+    print("[%d.00 Mk/s][GPU %d.00 Mk/s][C: %d%%]" % (900 + i, 900 + i, i * 20), flush=True)
+    time.sleep(0.2)
+emitted = keys
+code = 0
+with open(out, "w") as f:
+    if mode == "crash":
+        emitted = keys[:4]
+        f.write("".join("1Soak%d %s\n" % (i, k) for i, k in enumerate(emitted)))
+        code = 1
+    elif mode == "partial":
+        emitted = keys[:6]
+        f.write("".join("1Soak%d %s\n" % (i, k) for i, k in enumerate(emitted)))
+        f.write("1Soak6 " + keys[6][:30])
+        code = 1
+    else:
+        f.write("".join("1Soak%d %s\n" % (i, k) for i, k in enumerate(emitted)))
+signal.signal(signal.SIGTERM, signal.SIG_DFL)
+log_event(mode, emitted)
+sys.exit(code)
+'''
+
+# ---------------------------------------------------------------------------
+# Pool stand-in
+# ---------------------------------------------------------------------------
+
+def _block_keys(n):
+    """Checkwork keys of stand-in block n: the first KEYS_PER_BLOCK keys of its range, as the fake engine finds them."""
+    return ["%064x" % (n * BLOCK_SPAN + i) for i in range(KEYS_PER_BLOCK)]
+
+def _norm_key(k):
+    return str(k).lower().replace("0x", "").zfill(64)
+
+class PoolStandIn(ThreadingHTTPServer):
+    """
+    Pool API stand-in. Like src/app/api/block: the active block is handed
+    back until completed, a submit must contain every checkwork key of its
+    block (blockId or the active one), and three rejected submits expire it.
+    """
+    daemon_threads = True
+
+    def __init__(self, fetch_faults, submit_faults, refill_at=None):
+        super().__init__(("127.0.0.1", 0), _PoolHandler)
+        self.faults = {"fetch": list(fetch_faults), "submit": list(submit_faults)}
+        self.events = []
+        self.accepted = Counter()
+        self.blocks = 0
+        self.active = None
+        self.status = {}
+        self.strikes = Counter()
+        self.rejected = []
+        self.empty_fetches = 0
+        self.event_requests = 0
+        self.refill_at = refill_at
+        self.lock = threading.Lock()
+
+    def has_work(self):
+        return self.refill_at is None or time.time() >= self.refill_at
+
+    def next_fault(self, kind):
+        with self.lock:
+            fault = self.faults[kind].pop(0) if self.faults[kind] else "ok"
+            if fault != "ok":
+                self.events.append((time.time(), f"{kind}:{fault}"))
+            return fault
+
+    def validate_submit(self, payload):
+        """Check a submit like submit/route.ts; returns (status, error or None). Call with the lock held."""
+        block_id = payload.get("blockId") or (f"block-{self.active}" if self.active else None)
+        try:
+            n = int(str(block_id).rsplit("-", 1)[1])
+        except (IndexError, ValueError):
+            n = None
+        if n not in self.status:
+            return 404, "Block not found"
+        if self.status[n] != "ACTIVE":
+            self.rejected.append((n, "inactive"))
+            return 400, "Block already completed or expired"
+        submitted = {_norm_key(k) for k in payload.get("privateKeys", [])[:30]}
+        if not set(_block_keys(n)) <= submitted:
+            self.rejected.append((n, "missing keys"))
+            self.strikes[n] += 1
+            if self.strikes[n] >= 3:
+                self.status[n] = "EXPIRED"
+                if self.active == n:
+                    self.active = None
+            return 400, "Not all private keys are correct"
+        for k in submitted:
+            self.accepted[k] += 1
+        self.status[n] = "COMPLETED"
+        if self.active == n:
+            self.active = None
+        return 200, None
+
+    def faults_left(self):
+        with self.lock:
+            return len(self.faults["fetch"]) + len(self.faults["submit"])
+
+class _PoolHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, code, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stall(self, seconds):
+        time.sleep(seconds)
+        self.close_connection = True
+
+    def _work_events(self, query):
+        """
+        Server-sent events, a long-poll answer (200 work / 204 timeout) with
+        ?mode=poll, an immediate 204 that never holds the request with
+        ?mode=instant, or an immediate 200 whether or not there is work with
+        ?mode=instant200.
+        """
+        srv = self.server
+        with srv.lock:
+            srv.event_requests += 1
+        if query.get("mode") == ["instant"] and not srv.has_work():
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if query.get("mode") == ["instant200"]:
+            return self._reply(200, {"work": srv.has_work()})
+        if query.get("mode") == ["poll"]:
+            deadline = time.time() + float(query.get("timeout", ["25"])[0])
+            while not srv.has_work() and time.time() < deadline:
+                time.sleep(0.1)
+            if not srv.has_work():
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            return self._reply(200, {"work": True})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while not srv.has_work():
+                self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                time.sleep(0.5)
+            self.wfile.write(b"event: work\ndata: {}\n\n")
+            self.wfile.flush()
+        except OSError:
+            pass
+
+    def do_GET(self):
+        srv = self.server
+        url = urlsplit(self.path)
+        if url.path.endswith("/events"):
+            return self._work_events(parse_qs(url.query))
+        if not srv.has_work():
+            with srv.lock:
+                srv.empty_fetches += 1
+            return self._reply(409, {"error": "No available random range"})
+        fault = srv.next_fault("fetch")
+        if fault == "500":
+            return self._reply(500, {"error": "Internal error"})
+        if fault == "503":
+            return self._reply(503, {"error": "Service busy, retry later"}, {"Retry-After": "1"})
+        if fault == "no_range":
+            return self._reply(409, {"error": "No available random range"})
+        if fault == "timeout":
+            return self._stall(FETCH_CLIENT_TIMEOUT + 1)
+        with srv.lock:
+            # Like the pool, hand the active block back until it is completed.
+            if srv.active is None:
+                srv.blocks += 1
+                srv.active = srv.blocks
+                srv.status[srv.active] = "ACTIVE"
+            n = srv.active
+        start = n * BLOCK_SPAN
+        body = json.dumps({
+            "id": f"block-{n}",
+            "range": {"start": f"{start:x}", "end": f"{start + BLOCK_SPAN - 1:x}"},
+            "checkwork_addresses": [f"1Check{n}x{i}" for i in range(KEYS_PER_BLOCK)],
+        }).encode("utf-8")
+        if fault == "truncated":
+            body = body[: len(body) // 2]
+        return self._reply(200, body)
+
+    def do_POST(self):
+        srv = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        fault = srv.next_fault("submit")
+        if fault == "timeout":
+            return self._stall(SUBMIT_CLIENT_TIMEOUT + 1)
+        if fault == "500":
+            return self._reply(500, {"error": "Internal error"})
+        if fault == "incompatible":
+            return self._reply(400, {"error": "Incompatible privatekeys"})
+        with srv.lock:
+            code, error = srv.validate_submit(payload)
+        if error:
+            return self._reply(code, {"error": error})
+        body = json.dumps({"ok": True, "message": "Block completed"}).encode("utf-8")
+        if fault == "truncated":
+            body = body[:7]
+        return self._reply(200, body)
+
+# ---------------------------------------------------------------------------
+# Suite
+# ---------------------------------------------------------------------------
+
+def _prepare_workdir(pool, engine_faults, **settings):
+    """Copy the worker and a fake engine into a temp dir wired to `pool`."""
+    workdir = tempfile.mkdtemp(prefix="worker-soak-")
+    shutil.copy(os.path.join(HERE, "script.py"), workdir)
+    engine = os.path.join(workdir, "fake_engine.py")
+    with open(engine, "w", encoding="utf-8") as f:
+        f.write(FAKE_ENGINE.format(python=sys.executable, faults=json.dumps(engine_faults), per_block=KEYS_PER_BLOCK))
+    os.chmod(engine, 0o755)
+    base = {
+        "api_url": f"http://127.0.0.1:{pool.server_address[1]}/api/block",
+        "user_token": "soak",
+        "worker_name": "soak",
+        "vanitysearch_path": engine,
+        "additional_addresses": [],
+        "backoff_base_seconds": 1,
+        "backoff_max_seconds": 5,
+        "shutdown_flush_seconds": 30,
+        "log_file": "worker.log",
+    }
+    base.update(settings)
+    with open(os.path.join(workdir, "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(base, f)
+    return workdir
+
+def _read_engine_events(workdir):
+    path = os.path.join(workdir, "engine_events.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+@unittest.skipIf(os.name != "posix", "fake engine needs a POSIX shebang")
+class WorkerSoakTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = PoolStandIn(FETCH_FAULTS, SUBMIT_FAULTS)
+        threading.Thread(target=self.pool.serve_forever, daemon=True).start()
+        self.workdir = _prepare_workdir(self.pool, ENGINE_FAULTS)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.pool.server_close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _engine_events(self):
+        return _read_engine_events(self.workdir)
+
+    def _run_worker_until_faults_exhausted(self, max_seconds=600):
+        proc = subprocess.Popen(
+            [sys.executable, "script.py"], cwd=self.workdir,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + max_seconds
+        try:
+            while time.time() < deadline:
+                if proc.poll() is not None:
+                    self.fail(f"worker exited early with code {proc.returncode}")
+                if self.pool.faults_left() == 0 and len(self._engine_events()) >= len(ENGINE_FAULTS) + 2:
+                    break
+                time.sleep(0.5)
+            else:
+                self.fail("fault schedule not exhausted in time")
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=120)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+        return proc.returncode
+
+    def _recovery_latencies(self, engine_events):
+        faults = list(self.pool.events)
+        faults += [(e["end"], f"engine:{e['mode']}") for e in engine_events if e["mode"] != "ok"]
+        starts = sorted(e["start"] for e in engine_events)
+        latencies = defaultdict(list)
+        for ts, name in faults:
+            nxt = next((s for s in starts if s > ts), None)
+            if nxt is not None:
+                latencies[name].append(nxt - ts)
+        return latencies
+
+    def test_recovers_from_faults_without_losing_or_duplicating_keys(self):
+        code = self._run_worker_until_faults_exhausted()
+        self.assertEqual(code, 0, "worker did not shut down cleanly on SIGTERM")
+
+        events = self._engine_events()
+        engine_keys = {k for e in events for k in e["keys"]}
+        pending_path = os.path.join(self.workdir, "pending_keys.json")
+        leftover = set()
+        if os.path.exists(pending_path):
+            with open(pending_path, "r", encoding="utf-8") as f:
+                leftover = {_norm_key(k) for e in json.load(f) for k in e["keys"]}
+
+        lost = engine_keys - set(self.pool.accepted) - leftover
+        doubled = sorted(k for k in engine_keys if self.pool.accepted[k] > 1)
+
+        latencies = self._recovery_latencies(events)
+        print("\nrecovery latency until the engine scans again:")
+        for name in sorted(latencies):
+            vals = latencies[name]
+            print(f"  {name:<22} n={len(vals)} max={max(vals):6.1f}s avg={sum(vals) / len(vals):6.1f}s")
+        print(f"engine keys {len(engine_keys)}, accepted {len(engine_keys & set(self.pool.accepted))}, left pending {len(leftover & engine_keys)}")
+
+        self.assertFalse(lost, f"{len(lost)} found key(s) lost")
+        self.assertFalse(doubled, f"{len(doubled)} key(s) posted more than once")
+        self.assertEqual(self.pool.rejected, [], "worker submitted batches the pool rejects")
+        slow = {n: max(v) for n, v in latencies.items() if max(v) > RECOVERY_BUDGET}
+        self.assertFalse(slow, f"recovery slower than {RECOVERY_BUDGET:.0f}s: {slow}")
+        # After a crash the same block is scanned again, completed, and new blocks follow.
+        for failed in (e for e in events if e["mode"] != "ok"):
+            block = int(failed["keys"][0], 16) // BLOCK_SPAN
+            self.assertEqual(self.pool.status.get(block), "COMPLETED", f"block {block} not completed after engine {failed['mode']}")
+            later = [int(e["keys"][0], 16) // BLOCK_SPAN for e in events if e["start"] > failed["end"]]
+            self.assertTrue(any(b > block for b in later), f"no new block scanned after engine {failed['mode']}")
+
+@unittest.skipIf(os.name != "posix", "fake engine needs a POSIX shebang")
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = PoolStandIn([], [])
+        threading.Thread(target=self.pool.serve_forever, daemon=True).start()
+        self.workdir = _prepare_workdir(self.pool, [])
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.pool.server_close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _engine_events(self):
+        return _read_engine_events(self.workdir)
+
+    def test_checkpoint_rescans_the_block_and_moves_on(self):
+        def start_worker():
+            return subprocess.Popen([sys.executable, "script.py"], cwd=self.workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        def wait_for(predicate, seconds, what):
+            deadline = time.time() + seconds
+            while time.time() < deadline:
+                if predicate():
+                    return
+                time.sleep(0.1)
+            self.fail(f"timed out waiting for {what}")
+
+        state_path = os.path.join(self.workdir, "engine_state.json")
+
+        def launches():
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)["launch"]
+            except (OSError, ValueError, KeyError):
+                return 0
+
+        proc = start_worker()
+        try:
+            # Checkpoint (SIGINT) while the second block is being scanned.
+            wait_for(lambda: launches() >= 2, 120, "the second engine launch")
+            time.sleep(0.3)
+            proc.send_signal(signal.SIGINT)
+            self.assertEqual(proc.wait(timeout=120), 0, "worker did not checkpoint cleanly on SIGINT")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+        stopped = [e for e in self._engine_events() if e["mode"] == "stopped"]
+        self.assertEqual(len(stopped), 1, "engine was not stopped mid-block")
+        block = int(stopped[0]["keys"][0], 16) // BLOCK_SPAN
+        self.assertEqual(self.pool.status[block], "ACTIVE")
+
+        proc = start_worker()
+        try:
+            wait_for(lambda: any(int(e["keys"][0], 16) // BLOCK_SPAN > block for e in self._engine_events() if e["mode"] == "ok"),
+                     120, "a new block after the checkpoint")
+            proc.send_signal(signal.SIGTERM)
+            self.assertEqual(proc.wait(timeout=120), 0)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+
+        self.assertEqual(self.pool.status[block], "COMPLETED", "checkpointed block was not rescanned and completed")
+        self.assertEqual(self.pool.rejected, [], "worker submitted batches the pool rejects")
+        self.assertTrue(all(self.pool.accepted[k] == 1 for k in _block_keys(block)))
+
+@unittest.skipIf(os.name != "posix", "fake engine needs a POSIX shebang")
+class WorkAvailabilityTest(unittest.TestCase):
+    REFILL_AFTER = 6
+    # First fetch retry is drawn from [base/2, base], so without a wake-up the
+    # engine could not start sooner than REFILL_AFTER + 15s.
+    BACKOFF_BASE = 30
+    WAKE_BUDGET = 5
+
+    def _resume_latency(self, events_path, refill_after=None):
+        pool = PoolStandIn([], [], refill_at=time.time() + (refill_after or self.REFILL_AFTER))
+        threading.Thread(target=pool.serve_forever, daemon=True).start()
+        port = pool.server_address[1]
+        workdir = _prepare_workdir(
+            pool, [], backoff_base_seconds=self.BACKOFF_BASE, backoff_max_seconds=120,
+            work_events_url=f"http://127.0.0.1:{port}{events_path}",
+        )
+        proc = subprocess.Popen([sys.executable, "script.py"], cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = pool.refill_at + self.BACKOFF_BASE + 10
+            while time.time() < deadline and not _read_engine_events(workdir):
+                time.sleep(0.2)
+            events = _read_engine_events(workdir)
+            self.assertTrue(events, "engine never started after the pool refilled")
+            return events[0]["start"] - pool.refill_at, pool.empty_fetches, pool.event_requests
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            try:
+                proc.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            pool.shutdown()
+            pool.server_close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def test_server_sent_events_wake_the_worker(self):
+        latency, empty, _ = self._resume_latency("/api/block/events")
+        print(f"\nsse: resumed {latency:.1f}s after refill, {empty} empty fetch(es)")
+        self.assertLess(latency, self.WAKE_BUDGET)
+        self.assertLessEqual(empty, 1)
+
+    def test_long_poll_wakes_the_worker(self):
+        latency, empty, _ = self._resume_latency("/api/block/events?mode=poll")
+        print(f"\nlong-poll: resumed {latency:.1f}s after refill, {empty} empty fetch(es)")
+        self.assertLess(latency, self.WAKE_BUDGET)
+        self.assertLessEqual(empty, 1)
+
+    def test_instant_204_is_not_polled_in_a_tight_loop(self):
+        # Repolls back off from 5s up to 60s, so ~20s of waiting allows only a handful.
+        for mode in ("instant", "instant200"):
+            with self.subTest(mode=mode):
+                latency, empty, polls = self._resume_latency(f"/api/block/events?mode={mode}", refill_after=20)
+                print(f"\n{mode}: {polls} events request(s), {empty} empty fetch(es), resumed {latency:.1f}s after refill")
+                self.assertLessEqual(polls, 8)
+                self.assertLessEqual(empty, 8)
+
+if __name__ == "__main__":
+    unittest.main()